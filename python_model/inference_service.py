@@ -1,15 +1,34 @@
 """FastAPI inference service for the anomaly detection model."""
 from __future__ import annotations
 
+import asyncio
+import os
+import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import joblib
+import numpy as np
 import pandas as pd
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
+from sklearn.ensemble import IsolationForest
+from starlette.concurrency import run_in_threadpool
 
 BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.fdr_anomaly.pyramid import query_run  # noqa: E402
+from services.fdr_anomaly.similarity import similar_segments  # noqa: E402
+
+# Concurrent /predict calls are coalesced into one scaler/model pass. A batch
+# closes after BATCH_MAX_WAIT_MS or once it holds BATCH_MAX_ROWS rows.
+BATCHING_ENABLED = os.getenv("FDR_BATCHING", "1").lower() not in {"0", "false", "no"}
+BATCH_MAX_WAIT_MS = float(os.getenv("FDR_BATCH_MAX_WAIT_MS", "2"))
+BATCH_MAX_ROWS = int(os.getenv("FDR_BATCH_MAX_ROWS", "4096"))
 
 app = FastAPI(title="FDR Anomaly Detection Service", version="1.0.0")
 
@@ -54,11 +73,167 @@ class Artifacts:
 ARTIFACTS = Artifacts()
 
 
+def _score_features(feature_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    scaled_features = ARTIFACTS.scaler.transform(feature_df)
+    scores = ARTIFACTS.model.decision_function(scaled_features)
+    if isinstance(ARTIFACTS.model, IsolationForest):
+        # IsolationForest.predict is decision_function < 0; reuse the scores
+        # rather than walking the trees a second time.
+        predictions = np.where(scores < 0, -1, 1)
+    else:
+        predictions = ARTIFACTS.model.predict(scaled_features)
+    return predictions, scores
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into one vectorized pass.
+
+    Callers await :meth:`score`; a single collector task gathers queued
+    requests until ``max_wait_ms`` passes or ``max_rows`` rows are waiting,
+    scores the concatenated frame in a worker thread and hands each caller
+    back its own slice.
+    """
+
+    def __init__(self, max_wait_ms: float = BATCH_MAX_WAIT_MS, max_rows: int = BATCH_MAX_ROWS) -> None:
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_rows = max(1, max_rows)
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._metrics = {
+            "batches": 0,
+            "requests": 0,
+            "rows": 0,
+            "full_batches": 0,
+            "max_requests_per_batch": 0,
+            "split_batches": 0,
+            "queue_wait_seconds": 0.0,
+            "score_seconds": 0.0,
+        }
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def score(self, feature_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        if self._queue is None:
+            return await run_in_threadpool(_score_features, feature_df)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((feature_df, future, time.perf_counter()))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[pd.DataFrame, asyncio.Future, float]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while rows < self.max_rows:
+            try:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _collect(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            started = time.perf_counter()
+            frames = [frame for frame, _, _ in batch]
+            try:
+                combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                predictions, scores = await run_in_threadpool(_score_features, combined)
+            except Exception as exc:  # noqa: BLE001
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(exc)
+                    continue
+                # One bad request must not fail its batch-mates: score each
+                # member on its own so only the failing ones see the error.
+                await self._score_separately(batch)
+                self._metrics["split_batches"] += 1
+                self._record(batch, sum(len(frame) for frame in frames), started)
+                continue
+
+            offset = 0
+            for frame, future, _ in batch:
+                end = offset + len(frame)
+                if not future.done():
+                    future.set_result((predictions[offset:end], scores[offset:end]))
+                offset = end
+            self._record(batch, len(combined), started)
+
+    async def _score_separately(self, batch) -> None:
+        for frame, future, _ in batch:
+            try:
+                result = await run_in_threadpool(_score_features, frame)
+            except Exception as exc:  # noqa: BLE001
+                if not future.done():
+                    future.set_exception(exc)
+                continue
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, batch, rows: int, started: float) -> None:
+        metrics = self._metrics
+        metrics["batches"] += 1
+        metrics["requests"] += len(batch)
+        metrics["rows"] += rows
+        metrics["full_batches"] += int(rows >= self.max_rows)
+        metrics["max_requests_per_batch"] = max(metrics["max_requests_per_batch"], len(batch))
+        metrics["queue_wait_seconds"] += sum(started - queued for _, _, queued in batch)
+        metrics["score_seconds"] += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = dict(self._metrics)
+        batches = metrics["batches"] or 1
+        requests = metrics["requests"] or 1
+        return {
+            "enabled": self._queue is not None,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_rows": self.max_rows,
+            **metrics,
+            "mean_requests_per_batch": metrics["requests"] / batches,
+            "mean_rows_per_batch": metrics["rows"] / batches,
+            "mean_fill_ratio": metrics["rows"] / batches / self.max_rows,
+            "mean_queue_wait_ms": metrics["queue_wait_seconds"] / requests * 1000.0,
+        }
+
+
+BATCHER = MicroBatcher()
+
+
 @app.on_event("startup")
 def _load_artifacts() -> None:
     ARTIFACTS.load()
 
 
+@app.on_event("startup")
+async def _start_batcher() -> None:
+    if BATCHING_ENABLED:
+        BATCHER.start()
+
+
+@app.on_event("shutdown")
+async def _stop_batcher() -> None:
+    await BATCHER.stop()
+
+
 @app.get("/health")
 def health() -> Dict[str, str]:
     return {"status": "ok"}
@@ -84,21 +259,20 @@ def _prepare_features(df: pd.DataFrame) -> pd.DataFrame:
     return feature_df[ARTIFACTS.features]
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(request: PredictRequest) -> PredictResponse:
-    if not ARTIFACTS.model or not ARTIFACTS.scaler:
-        raise HTTPException(status_code=500, detail="Model artifacts are not loaded")
-
-    normalized = _normalize_rows(request.rows)
+def _prepare_request(rows: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    normalized = _normalize_rows(rows)
     if normalized.empty:
         raise HTTPException(status_code=400, detail="No valid rows supplied (missing timestamps)")
+    return normalized, _prepare_features(normalized)
 
-    feature_df = _prepare_features(normalized)
-    scaled_features = ARTIFACTS.scaler.transform(feature_df)
-
-    predictions = ARTIFACTS.model.predict(scaled_features)
-    scores = ARTIFACTS.model.decision_function(scaled_features)
 
+def _build_response(
+    total_rows: int,
+    normalized: pd.DataFrame,
+    feature_df: pd.DataFrame,
+    predictions: np.ndarray,
+    scores: np.ndarray,
+) -> PredictResponse:
     response_scores: List[Dict[str, Any]] = []
     anomalies: List[Dict[str, Any]] = []
 
@@ -121,7 +295,7 @@ def predict(request: PredictRequest) -> PredictResponse:
         anomaly_percentage = (len(anomalies) / evaluated_rows) * 100
 
     return PredictResponse(
-        total_rows=len(request.rows),
+        total_rows=total_rows,
         evaluated_rows=evaluated_rows,
         anomaly_count=len(anomalies),
         anomaly_percentage=anomaly_percentage,
@@ -131,6 +305,63 @@ def predict(request: PredictRequest) -> PredictResponse:
     )
 
 
+@app.get("/metrics/batching")
+def batching_metrics() -> Dict[str, Any]:
+    return BATCHER.stats()
+
+
+@app.get("/runs/{run_id}/timeline")
+def run_timeline(
+    run_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    width: int = 1000,
+    features: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Min/max/mean score buckets of a cached analysis run for one view range."""
+
+    names = [name.strip() for name in features.split(",") if name.strip()] if features else None
+    try:
+        return query_run(run_id, start=start, end=end, width=width, features=names)
+    except KeyError as exc:
+        raise HTTPException(status_code=400, detail=str(exc.args[0])) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.get("/runs/{run_id}/similar")
+def run_similar_segments(
+    run_id: str,
+    start: float,
+    end: float,
+    k: int = 10,
+    include_same_flight: bool = False,
+) -> Dict[str, Any]:
+    """Previously indexed segments whose error profile is closest to this range."""
+
+    try:
+        matches = similar_segments(
+            run_id, start, end, k=k, include_same_flight=include_same_flight
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return {"run_id": run_id, "start": start, "end": end, "matches": matches}
+
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(request: PredictRequest) -> PredictResponse:
+    if not ARTIFACTS.model or not ARTIFACTS.scaler:
+        raise HTTPException(status_code=500, detail="Model artifacts are not loaded")
+
+    # Parsing and response building stay off the event loop; only scoring
+    # goes through the shared micro-batcher.
+    normalized, feature_df = await run_in_threadpool(_prepare_request, request.rows)
+    predictions, scores = await BATCHER.score(feature_df)
+    return await run_in_threadpool(
+        _build_response, len(request.rows), normalized, feature_df, predictions, scores
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,475 @@
+"""Load generator for the FastAPI inference service.
+
+Usage:
+    python load_test.py                                   # in-process server
+    python load_test.py --mode subprocess --workers 4      # uvicorn on localhost
+    python load_test.py --url http://127.0.0.1:8000        # already running server
+    python load_test.py --concurrency 1,8,32 --rows 50,500,5000 --output load.json
+
+Synthetic flights are built from ``FEATURE_MAP`` and posted to ``/predict``
+from a pool of keep-alive connections, one concurrency level at a time. The
+JSON report lists per-level latency percentiles and a histogram,
+throughput in requests and rows per second, error counts by status, the
+server's batching metrics for each level's measured requests and the
+resident memory of the server processes. Only the standard library is used
+on the client side.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from utils import FEATURE_MAP
+
+BASE_DIR = Path(__file__).resolve().parent
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+PAYLOAD_VARIANTS = 4
+BATCHING_COUNTERS = (
+    "batches",
+    "requests",
+    "rows",
+    "full_batches",
+    "split_batches",
+    "queue_wait_seconds",
+    "score_seconds",
+)
+
+# (level, amplitude, noise) per feature, roughly a light twin in cruise.
+FEATURE_PROFILES: Dict[str, Tuple[float, float, float]] = {
+    "GPS Altitude": (5000.0, 1000.0, 5.0),
+    "Pressure Altitude": (5000.0, 1000.0, 8.0),
+    "Indicated Airspeed": (120.0, 10.0, 1.0),
+    "Ground Speed": (122.0, 10.0, 1.0),
+    "True Airspeed": (126.0, 10.0, 1.0),
+    "Vertical Speed": (0.0, 300.0, 100.0),
+    "Pitch": (2.0, 2.0, 1.0),
+    "Roll": (0.0, 5.0, 2.0),
+    "Magnetic Heading": (180.0, 90.0, 0.5),
+    "RPM Left": (2400.0, 50.0, 20.0),
+    "RPM Right": (2400.0, 50.0, 20.0),
+    "Fuel Flow 1": (12.0, 1.0, 0.3),
+    "Outside Air Temperature": (5.0, 2.0, 0.2),
+    "Latitude": (33.0, 0.1, 0.0001),
+    "Longitude": (-118.0, 0.1, 0.0001),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the inference service")
+    parser.add_argument(
+        "--mode",
+        choices=("inprocess", "subprocess"),
+        default="inprocess",
+        help="Start the app in this process or as a uvicorn subprocess (ignored with --url)",
+    )
+    parser.add_argument("--url", default=None, help="Target an already running service")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn worker processes in subprocess mode"
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="Comma-separated numbers of concurrent clients, one level each",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests sent at each concurrency level"
+    )
+    parser.add_argument(
+        "--rows",
+        default="50,500,2000",
+        help="Comma-separated flight sizes in rows; requests cycle through them",
+    )
+    parser.add_argument(
+        "--anomaly-rate",
+        type=float,
+        default=0.01,
+        help="Fraction of rows given an injected spike",
+    )
+    parser.add_argument("--warmup", type=int, default=10, help="Unrecorded requests per level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write the report here")
+    return parser.parse_args()
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def synthetic_rows(n_rows: int, rng: np.random.Generator, anomaly_rate: float) -> List[Dict[str, Any]]:
+    """A flight of ``n_rows`` one-second samples using the model's feature names."""
+
+    t = np.arange(n_rows, dtype=float)
+    start = datetime(2024, 5, 12, tzinfo=timezone.utc)
+    columns = {}
+    for feature in FEATURE_MAP:
+        level, amplitude, noise = FEATURE_PROFILES.get(feature, (0.0, 1.0, 0.1))
+        phase = rng.uniform(0, 2 * np.pi)
+        values = level + amplitude * np.sin(t / 300.0 + phase) + rng.normal(0, noise, n_rows)
+        spikes = rng.random(n_rows) < anomaly_rate
+        values[spikes] += rng.choice((-1.0, 1.0), spikes.sum()) * (amplitude + 10 * noise) * 3
+        columns[feature] = np.round(values, 4)
+
+    rows = []
+    for idx in range(n_rows):
+        row: Dict[str, Any] = {"timestamp": (start + timedelta(seconds=idx)).isoformat()}
+        for feature, values in columns.items():
+            row[feature] = float(values[idx])
+        rows.append(row)
+    return rows
+
+
+def build_payloads(sizes: Sequence[int], anomaly_rate: float, seed: int) -> List[Tuple[int, bytes]]:
+    """Pre-encoded request bodies so client-side JSON work stays out of the timings."""
+
+    rng = np.random.default_rng(seed)
+    return [
+        (size, json.dumps({"rows": synthetic_rows(size, rng, anomaly_rate)}).encode())
+        for _ in range(PAYLOAD_VARIANTS)
+        for size in sizes
+    ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(
+    host: str, port: int, method: str, path: str, body: Optional[bytes], timeout: float
+) -> Tuple[int, bytes]:
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def wait_until_healthy(host: str, port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = _request(host, port, "GET", "/health", None, timeout=2.0)
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Service on {host}:{port} did not become healthy within {timeout:.0f}s")
+
+
+class InProcessServer:
+    """uvicorn serving ``inference_service.app`` on a background thread."""
+
+    def __init__(self) -> None:
+        import uvicorn
+
+        from inference_service import app
+
+        self.port = _free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self.pids = [os.getpid()]
+
+    def __enter__(self) -> "InProcessServer":
+        self._thread.start()
+        wait_until_healthy("127.0.0.1", self.port)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class SubprocessServer:
+    """``uvicorn inference_service:app`` with ``workers`` processes on localhost."""
+
+    def __init__(self, workers: int) -> None:
+        self.port = _free_port()
+        self.workers = max(1, workers)
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def pids(self) -> List[int]:
+        if self._process is None:
+            return []
+        return [self._process.pid, *_descendants(self._process.pid)]
+
+    def __enter__(self) -> "SubprocessServer":
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "inference_service:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(self.port),
+            "--workers",
+            str(self.workers),
+            "--log-level",
+            "warning",
+        ]
+        self._process = subprocess.Popen(command, cwd=BASE_DIR)
+        try:
+            wait_until_healthy("127.0.0.1", self.port)
+        except RuntimeError:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
+def _descendants(pid: int) -> List[int]:
+    """Child process ids from /proc (empty where /proc is unavailable)."""
+
+    parents: Dict[int, List[int]] = {}
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            # The command name may contain spaces; fields resume after ")".
+            stat = (entry / "stat").read_text()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry.name))
+    found, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return None
+
+
+def memory_report(pids: Sequence[int]) -> Optional[Dict[str, Any]]:
+    per_process = {str(pid): _rss_mb(pid) for pid in pids}
+    known = [value for value in per_process.values() if value is not None]
+    if not known:
+        return None
+    return {"rss_mb": per_process, "total_rss_mb": round(sum(known), 1)}
+
+
+def latency_summary(latencies_ms: np.ndarray) -> Dict[str, Any]:
+    if latencies_ms.size == 0:
+        return {"latency_ms": None, "histogram": []}
+    counts = np.histogram(latencies_ms, bins=(0, *HISTOGRAM_BOUNDS_MS, np.inf))[0]
+    return {
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 3),
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p90": round(float(np.percentile(latencies_ms, 90)), 3),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "max": round(float(latencies_ms.max()), 3),
+        },
+        "histogram": [
+            {"le_ms": bound, "count": int(count)}
+            for bound, count in zip((*HISTOGRAM_BOUNDS_MS, "inf"), counts)
+        ],
+    }
+
+
+def run_level(
+    host: str,
+    port: int,
+    payloads: Sequence[Tuple[int, bytes]],
+    concurrency: int,
+    n_requests: int,
+    warmup: int,
+    timeout: float,
+    snapshot: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    local = threading.local()
+
+    def send(index: int) -> Tuple[int, int, float, Optional[str]]:
+        rows, body = payloads[index % len(payloads)]
+        if getattr(local, "connection", None) is None:
+            local.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        started = time.perf_counter()
+        try:
+            local.connection.request(
+                "POST", "/predict", body=body, headers={"Content-Type": "application/json"}
+            )
+            response = local.connection.getresponse()
+            response.read()
+            status, error = response.status, None
+        except (OSError, http.client.HTTPException) as exc:
+            local.connection.close()
+            local.connection = None
+            status, error = 0, type(exc).__name__
+        return rows, status, (time.perf_counter() - started) * 1000.0, error
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(warmup)))
+        # Server counters are cumulative; bracket the measured requests only.
+        before = snapshot() if snapshot else None
+        started = time.perf_counter()
+        results = list(executor.map(send, range(warmup, warmup + n_requests)))
+        elapsed = time.perf_counter() - started
+        after = snapshot() if snapshot else None
+
+    ok = [(rows, latency) for rows, status, latency, _ in results if status == 200]
+    errors: Dict[str, int] = {}
+    for _, status, _, error in results:
+        if status != 200:
+            key = error or str(status)
+            errors[key] = errors.get(key, 0) + 1
+    latencies = np.array([latency for _, latency in ok])
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "succeeded": len(ok),
+        "errors": errors,
+        "error_rate": round(1.0 - len(ok) / n_requests, 6) if n_requests else 0.0,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "rows_per_second": round(sum(rows for rows, _ in ok) / elapsed, 1) if elapsed else None,
+        **latency_summary(latencies),
+        "batching": batching_delta(before, after),
+    }
+
+
+def batching_stats(host: str, port: int) -> Optional[Dict[str, Any]]:
+    try:
+        status, body = _request(host, port, "GET", "/metrics/batching", None, timeout=5.0)
+    except OSError:
+        return None
+    return json.loads(body) if status == 200 else None
+
+
+def batching_delta(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Batching metrics of the requests between two ``/metrics/batching`` snapshots."""
+
+    if before is None or after is None:
+        return None
+    delta = {key: after.get(key, 0) - before.get(key, 0) for key in BATCHING_COUNTERS}
+    batches = delta["batches"] or 1
+    requests = delta["requests"] or 1
+    return {
+        "enabled": after.get("enabled"),
+        "max_wait_ms": after.get("max_wait_ms"),
+        "max_rows": after.get("max_rows"),
+        **delta,
+        "queue_wait_seconds": round(delta["queue_wait_seconds"], 6),
+        "score_seconds": round(delta["score_seconds"], 6),
+        "mean_requests_per_batch": round(delta["requests"] / batches, 3),
+        "mean_rows_per_batch": round(delta["rows"] / batches, 1),
+        "mean_fill_ratio": round(delta["rows"] / batches / (after.get("max_rows") or 1), 4),
+        "mean_queue_wait_ms": round(delta["queue_wait_seconds"] / requests * 1000.0, 3),
+        # A running maximum cannot be differenced.
+        "max_requests_per_batch_since_start": after.get("max_requests_per_batch"),
+    }
+
+
+def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    sizes = _int_list(args.rows)
+    payloads = build_payloads(sizes, args.anomaly_rate, args.seed)
+
+    if args.url:
+        parsed = urlparse(args.url)
+        server = None
+        host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+        wait_until_healthy(host, port)
+        mode = "external"
+    else:
+        server = InProcessServer() if args.mode == "inprocess" else SubprocessServer(args.workers)
+        server.__enter__()
+        host, port = "127.0.0.1", server.port
+        mode = args.mode
+
+    try:
+        idle_memory = memory_report(server.pids) if server else None
+        # Each uvicorn worker keeps its own counters and /metrics/batching
+        # reaches whichever one accepts the connection, so differences
+        # between snapshots are only meaningful for a single process.
+        single_process = mode != "subprocess" or args.workers <= 1
+        snapshot = (lambda: batching_stats(host, port)) if single_process else None
+        levels = []
+        for concurrency in _int_list(args.concurrency):
+            level = run_level(
+                host,
+                port,
+                payloads,
+                concurrency,
+                args.requests,
+                args.warmup,
+                args.timeout,
+                snapshot,
+            )
+            level["memory"] = memory_report(server.pids) if server else None
+            levels.append(level)
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+
+    return {
+        "target": {
+            "mode": mode,
+            "url": f"http://{host}:{port}",
+            "workers": args.workers if mode == "subprocess" else None,
+            "batching_metrics": "per level"
+            if single_process
+            else "omitted: /metrics/batching reaches only one of the workers",
+        },
+        "workload": {
+            "rows": sizes,
+            "payload_bytes": {str(size): len(body) for size, body in payloads[: len(sizes)]},
+            "requests_per_level": args.requests,
+            "warmup": args.warmup,
+            "anomaly_rate": args.anomaly_rate,
+            "seed": args.seed,
+        },
+        "idle_memory": idle_memory,
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    report = json.dumps(run_load_test(args), indent=2)
+    if args.output:
+        args.output.write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
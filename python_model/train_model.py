@@ -2,26 +2,41 @@
 
 Usage:
     python train_model.py [--csv /path/to/EXAMPLE FDR_with anomaly.csv]
+    python train_model.py --data-dir /path/to/flights [--workers 8]
+    python train_model.py --manifest /path/to/flights.txt [--reservoir-size 100000]
 
-The script loads the example CSV, applies preprocessing (numeric coercion,
-median imputation, standard scaling), trains an IsolationForest model, and
-writes the artifacts to the current directory:
+The script loads one or many flight files, applies preprocessing (numeric
+coercion, median imputation, standard scaling), trains an IsolationForest
+model, and writes the artifacts to the current directory:
 
 - model.joblib
 - scaler.joblib (imputer + scaler pipeline)
 - features.joblib (ordered list of feature names)
+
+Flights are read in parallel and pruned to the ``FEATURE_MAP`` headers while
+parsing. Scaler statistics are accumulated incrementally from NaN-aware
+running moments, medians are estimated from a uniform reservoir sample, and
+the forest is trained on that reservoir, so memory stays bounded by the
+number of in-flight files plus the reservoir regardless of fleet size.
 """
 from __future__ import annotations
 
 import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, List
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 
 from utils import (
+    DEFAULT_TIMESTAMP_FIELDS,
     FEATURE_MAP,
     add_timestamp_column,
     build_feature_dataframe,
@@ -30,15 +45,47 @@ from utils import (
     resolve_dataset_path,
 )
 
+SUPPORTED_SUFFIXES = (".csv", ".xlsx", ".xls")
+DEFAULT_RESERVOIR_SIZE = 100_000
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Train the anomaly detection model")
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
         "--csv",
         dest="csv_path",
         default=None,
         help="Optional path to the training CSV file (defaults to repository sample)",
     )
+    source.add_argument(
+        "--data-dir",
+        dest="data_dir",
+        default=None,
+        type=Path,
+        help="Directory of flight files (.csv/.xlsx/.xls) to train on",
+    )
+    source.add_argument(
+        "--manifest",
+        dest="manifest",
+        default=None,
+        type=Path,
+        help="Text file listing one flight file per line (relative to the manifest)",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        default=os.cpu_count() or 1,
+        type=int,
+        help="Number of processes used to read flight files",
+    )
+    parser.add_argument(
+        "--reservoir-size",
+        dest="reservoir_size",
+        default=DEFAULT_RESERVOIR_SIZE,
+        type=int,
+        help="Maximum number of rows kept in memory for medians and forest training",
+    )
     parser.add_argument(
         "--output-dir",
         dest="output_dir",
@@ -49,19 +96,258 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def load_training_data(csv_path: str | Path | None = None) -> pd.DataFrame:
-    path = resolve_dataset_path(csv_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Training CSV not found at {path}")
+def _is_source_column(column: str) -> bool:
+    return column in FEATURE_MAP.values() or column in DEFAULT_TIMESTAMP_FIELDS
+
+
+def _read_source(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(path, usecols=_is_source_column)
+    return pd.read_csv(path, usecols=_is_source_column, low_memory=False)
+
 
-    df = pd.read_csv(path)
-    df = add_timestamp_column(df)
+def _load_features(path: str | Path) -> pd.DataFrame:
+    df = add_timestamp_column(_read_source(path))
     feature_df = build_feature_dataframe(df)
     # Drop rows that are entirely missing after coercion.
     feature_df = feature_df.dropna(how="all")
     return feature_df.reset_index(drop=True)
 
 
+def _load_feature_matrix(path: str | Path) -> np.ndarray:
+    return _load_features(path).to_numpy(dtype=float, na_value=np.nan)
+
+
+def load_training_data(csv_path: str | Path | None = None) -> pd.DataFrame:
+    path = resolve_dataset_path(csv_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Training CSV not found at {path}")
+
+    return _load_features(path)
+
+
+def resolve_training_sources(
+    csv_path: str | Path | None = None,
+    data_dir: str | Path | None = None,
+    manifest: str | Path | None = None,
+) -> List[Path]:
+    """Resolve the list of flight files to train on.
+
+    Parameters
+    ----------
+    csv_path: str | Path | None
+        Single training file (defaults to the repository sample).
+    data_dir: str | Path | None
+        Directory whose ``.csv``/``.xlsx``/``.xls`` files are all used.
+    manifest: str | Path | None
+        Text file with one path per line. Blank lines and ``#`` comments are
+        ignored; relative paths are resolved against the manifest directory.
+    """
+
+    if data_dir:
+        directory = Path(data_dir).expanduser().resolve()
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Training directory not found at {directory}")
+        sources = sorted(
+            path for path in directory.iterdir() if path.suffix.lower() in SUPPORTED_SUFFIXES
+        )
+    elif manifest:
+        manifest_path = Path(manifest).expanduser().resolve()
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Training manifest not found at {manifest_path}")
+        sources = []
+        for line in manifest_path.read_text().splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            path = Path(entry).expanduser()
+            if not path.is_absolute():
+                path = manifest_path.parent / path
+            sources.append(path.resolve())
+    else:
+        sources = [resolve_dataset_path(csv_path)]
+
+    missing = [str(path) for path in sources if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Training files not found: {', '.join(missing)}")
+    if not sources:
+        raise FileNotFoundError("No training files found")
+    return sources
+
+
+def iter_feature_matrices(sources: Iterable[Path], workers: int = 1) -> Iterator[np.ndarray]:
+    """Yield per-flight feature matrices, reading up to ``workers`` files at once.
+
+    Only ``2 * workers`` files are in flight at any time so a slow consumer
+    cannot make results pile up in memory.
+    """
+
+    sources = list(sources)
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield _load_feature_matrix(source)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending_sources = iter(sources)
+        in_flight = set()
+        for source in pending_sources:
+            in_flight.add(executor.submit(_load_feature_matrix, source))
+            if len(in_flight) >= 2 * workers:
+                break
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                next_source = next(pending_sources, None)
+                if next_source is not None:
+                    in_flight.add(executor.submit(_load_feature_matrix, next_source))
+
+
+class ReservoirSample:
+    """Uniform fixed-size row sample over a stream of matrices (Algorithm R)."""
+
+    def __init__(self, capacity: int, n_features: int, random_state: int = 42) -> None:
+        self.capacity = capacity
+        self.rows = np.empty((capacity, n_features), dtype=float)
+        self.seen = 0
+        self.rng = np.random.default_rng(random_state)
+
+    def update(self, chunk: np.ndarray) -> None:
+        if chunk.shape[0] == 0:
+            return
+        filled = min(self.seen, self.capacity)
+        take = min(self.capacity - filled, chunk.shape[0])
+        if take:
+            self.rows[filled : filled + take] = chunk[:take]
+        rest = chunk[take:]
+        if rest.shape[0]:
+            positions = np.arange(self.seen + take, self.seen + chunk.shape[0])
+            slots = self.rng.integers(0, positions + 1)
+            keep = slots < self.capacity
+            # Fancy assignment keeps the last write for repeated slots, which
+            # matches the sequential replacement order of Algorithm R.
+            self.rows[slots[keep]] = rest[keep]
+        self.seen += chunk.shape[0]
+
+    @property
+    def sample(self) -> np.ndarray:
+        return self.rows[: min(self.seen, self.capacity)]
+
+
+class RunningMoments:
+    """NaN-aware per-feature count, mean and sum of squared deviations.
+
+    Chunks are merged with Chan's parallel update so the result matches a
+    single pass over the concatenated stream.
+    """
+
+    def __init__(self, n_features: int) -> None:
+        self.count = np.zeros(n_features, dtype=float)
+        self.mean = np.zeros(n_features, dtype=float)
+        self.m2 = np.zeros(n_features, dtype=float)
+
+    def update(self, chunk: np.ndarray) -> None:
+        observed = ~np.isnan(chunk)
+        chunk_count = observed.sum(axis=0).astype(float)
+        safe_count = np.where(chunk_count == 0, 1.0, chunk_count)
+        chunk_mean = np.where(observed, chunk, 0.0).sum(axis=0) / safe_count
+        chunk_m2 = np.where(observed, (chunk - chunk_mean) ** 2, 0.0).sum(axis=0)
+
+        total = self.count + chunk_count
+        safe_total = np.where(total == 0, 1.0, total)
+        delta = chunk_mean - self.mean
+        self.mean = self.mean + delta * chunk_count / safe_total
+        self.m2 = self.m2 + chunk_m2 + delta**2 * self.count * chunk_count / safe_total
+        self.count = total
+
+
+def _imputed_scaler(
+    moments: RunningMoments, medians: np.ndarray, total_rows: int, keep: np.ndarray
+) -> StandardScaler:
+    """Build a fitted scaler for the median-imputed stream from running moments.
+
+    The moments skip missing values, whereas the pipeline scales values after
+    imputation. Adding the imputed median rows to the observed moments gives
+    the same statistics as fitting on the fully imputed stream.
+    """
+
+    observed = moments.count[keep]
+    mean = moments.mean[keep]
+    m2 = moments.m2[keep]
+    medians = medians[keep]
+    missing = total_rows - observed
+
+    combined_mean = (observed * mean + missing * medians) / total_rows
+    combined_var = (
+        m2 + observed * (mean - combined_mean) ** 2 + missing * (medians - combined_mean) ** 2
+    ) / total_rows
+
+    scaler = StandardScaler()
+    scaler.n_features_in_ = int(keep.sum())
+    scaler.n_samples_seen_ = total_rows
+    scaler.mean_ = combined_mean
+    scaler.var_ = combined_var
+    scale = np.sqrt(combined_var)
+    scaler.scale_ = np.where(scale == 0.0, 1.0, scale)
+    return scaler
+
+
+def train_model_streaming(
+    sources: Iterable[Path],
+    workers: int = 1,
+    reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+) -> dict[str, Any]:
+    """Train on many flights with bounded memory.
+
+    Each flight updates the running scaler moments and the reservoir sample,
+    then is discarded. Imputer medians come from the reservoir and the forest
+    is fit on the transformed reservoir.
+    """
+
+    feature_names = get_feature_names()
+    moments = RunningMoments(len(feature_names))
+    reservoir = ReservoirSample(reservoir_size, len(feature_names))
+
+    for matrix in iter_feature_matrices(sources, workers=workers):
+        if matrix.shape[0] == 0:
+            continue
+        moments.update(matrix)
+        reservoir.update(matrix)
+
+    if reservoir.seen == 0:
+        raise ValueError("No usable training rows found in the supplied flights.")
+
+    sample = pd.DataFrame(reservoir.sample, columns=feature_names)
+    imputer = SimpleImputer(strategy="median")
+    imputer.fit(sample)
+    medians = sample.median().to_numpy(dtype=float)
+    keep = ~np.isnan(medians)
+    preprocess = Pipeline(
+        steps=[
+            ("imputer", imputer),
+            ("scaler", _imputed_scaler(moments, medians, reservoir.seen, keep)),
+        ]
+    )
+
+    model = IsolationForest(
+        n_estimators=300,
+        contamination="auto",
+        random_state=42,
+        n_jobs=-1,
+    )
+    model.fit(preprocess.transform(sample))
+
+    return {
+        "model": model,
+        "scaler": preprocess,
+        "features": feature_names,
+        "rows_seen": reservoir.seen,
+        "rows_sampled": int(sample.shape[0]),
+    }
+
+
 def train_model(features: pd.DataFrame) -> dict[str, Any]:
     preprocess = create_preprocess_pipeline()
     transformed = preprocess.fit_transform(features)
@@ -90,9 +376,14 @@ def persist_artifacts(artifacts: dict[str, Any], output_dir: Path) -> None:
 
 if __name__ == "__main__":
     args = parse_args()
-    feature_data = load_training_data(args.csv_path)
-    artifacts = train_model(feature_data)
+    sources = resolve_training_sources(args.csv_path, args.data_dir, args.manifest)
+    artifacts = train_model_streaming(
+        sources, workers=args.workers, reservoir_size=args.reservoir_size
+    )
     persist_artifacts(artifacts, args.output_dir)
 
     print(f"Saved model artifacts to {args.output_dir.resolve()}")
-    print(f"Trained on {len(feature_data)} rows using features: {', '.join(FEATURE_MAP.keys())}")
\ No newline at end of file
+    print(
+        f"Trained on {artifacts['rows_sampled']} sampled rows out of {artifacts['rows_seen']} "
+        f"from {len(sources)} flight(s) using features: {', '.join(FEATURE_MAP.keys())}"
+    )
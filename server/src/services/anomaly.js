@@ -37,7 +37,12 @@ const ANALYSIS_VERSION = '1.0';
 const PYTHON_BIN = process.env.PYTHON_BIN || 'python3';
 const PYTHON_MODULE = 'services.fdr_anomaly.run_detect';
 const PYTHON_CWD = path.resolve(__dirname, '../../..');
+const FDR_SCHEDULER_URL = (process.env.FDR_SCHEDULER_URL || '').replace(/\/+$/, '');
+const FDR_SCHEDULER_POLL_MS = Number(process.env.FDR_SCHEDULER_POLL_MS) || 1000;
+const FDR_JOB_TIMEOUT_SECONDS = Number(process.env.FDR_JOB_TIMEOUT_SECONDS) || null;
+const TERMINAL_JOB_STATUSES = new Set(['succeeded', 'failed', 'cancelled', 'timeout']);
 const execFileAsync = promisify(execFile);
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 const parseCsv = (text) => {
   const lines = (text || '')
@@ -277,11 +282,16 @@ const parsePythonErrorMessage = (error) => {
   return match?.[1]?.trim() || '';
 };
 
-const runPythonDetection = async (filePath) => {
+const similarityArgs = ({ flightId, caseId } = {}) => [
+  ...(flightId ? ['--flight-id', String(flightId)] : []),
+  ...(caseId ? ['--case-id', String(caseId)] : []),
+];
+
+const runPythonDetection = async (filePath, ids) => {
   try {
     const { stdout, stderr } = await execFileAsync(
       PYTHON_BIN,
-      ['-m', PYTHON_MODULE, filePath],
+      ['-m', PYTHON_MODULE, filePath, ...similarityArgs(ids)],
       {
         cwd: PYTHON_CWD,
         encoding: 'utf8',
@@ -306,6 +316,45 @@ const runPythonDetection = async (filePath) => {
   }
 };
 
+const schedulerRequest = async (method, route, body) => {
+  const response = await fetch(`${FDR_SCHEDULER_URL}${route}`, {
+    method,
+    headers: body ? { 'Content-Type': 'application/json' } : undefined,
+    body: body ? JSON.stringify(body) : undefined,
+  });
+  const payload = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    const error = new Error(payload?.detail || `Scheduler request failed (${response.status})`);
+    error.status = response.status === 400 ? 400 : 502;
+    throw error;
+  }
+  return payload;
+};
+
+const runScheduledDetection = async (filePath, { flightId, caseId } = {}) => {
+  const job = await schedulerRequest('POST', '/jobs', {
+    path: filePath,
+    timeout: FDR_JOB_TIMEOUT_SECONDS,
+    options: {
+      ...(flightId ? { flight_id: String(flightId) } : {}),
+      ...(caseId ? { case_id: String(caseId) } : {}),
+    },
+  });
+
+  let status = job;
+  while (!TERMINAL_JOB_STATUSES.has(status.status)) {
+    await sleep(FDR_SCHEDULER_POLL_MS);
+    status = await schedulerRequest('GET', `/jobs/${job.job_id}`);
+  }
+
+  if (status.status !== 'succeeded') {
+    const error = new Error(status.error || `FDR analysis ${status.status}.`);
+    error.status = status.status === 'failed' ? 400 : 503;
+    throw error;
+  }
+  return schedulerRequest('GET', `/jobs/${job.job_id}/result`);
+};
+
 const analyzeFdrForCase = async (caseNumber, options = {}) => {
   const caseData = await findCaseByNumber(caseNumber);
   if (!caseData) {
@@ -332,7 +381,10 @@ const analyzeFdrForCase = async (caseNumber, options = {}) => {
 
   try {
     await fs.writeFile(tempFilePath, fileBuffer);
-    const analysis = await runPythonDetection(tempFilePath);
+    const ids = { flightId: fdrAttachment.storage.objectKey, caseId: caseNumber };
+    const analysis = FDR_SCHEDULER_URL
+      ? await runScheduledDetection(tempFilePath, ids)
+      : await runPythonDetection(tempFilePath, ids);
     const payload = {
       ...analysis,
       analysis_version: analysis?.analysis_version || ANALYSIS_VERSION,
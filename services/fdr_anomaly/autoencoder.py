@@ -1,20 +1,66 @@
 import importlib.util
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.decomposition import PCA
 
+from services.fdr_anomaly.flight import FlightFrame, group_runs, load_flight
+from services.fdr_anomaly.model_registry import (
+    COMPILED_RUNTIMES,
+    DEFAULT_COMPILED_RUNTIME,
+    MODEL_REGISTRY,
+    REUSE_SCHEMA_MODELS,
+    DenseLayers,
+    RegistryEntry,
+    base_model_key,
+    build_onnx,
+    model_key,
+    onnx_available,
+)
+from services.fdr_anomaly.profiling import select_numeric_columns
+from services.fdr_anomaly.pruning import DEFAULT_PRUNE_CHANNELS, prune_channels
+from services.fdr_anomaly.pyramid import PYRAMID_SUFFIX, TimelinePyramid
+from services.fdr_anomaly.resample import (
+    DEFAULT_RESAMPLE_HZ,
+    attach_source_rows,
+    describe_resampling,
+    resample_frame,
+)
+from services.fdr_anomaly.similarity import SEGMENT_INDEX, index_segments
+from services.fdr_anomaly.score_stats import MEDIUM_SEVERITY_PERCENTILE, ScoreStats
+from services.fdr_anomaly.shared_buffers import SharedArrayPool, SharedArraySpec, attach
+from services.fdr_anomaly.stage_cache import RUN_CACHE, RunCache
+from services.fdr_anomaly.topk import rank_top_parameters, top_k_indices
+
 
 DEFAULT_WINDOW_SIZE = int(os.getenv("FDR_WINDOW_SIZE", "60"))
 DEFAULT_STRIDE = int(os.getenv("FDR_WINDOW_STRIDE", "5"))
 DEFAULT_EPOCHS = int(os.getenv("FDR_EPOCHS", "30"))
 DEFAULT_THRESHOLD_PERCENTILE = float(os.getenv("FDR_THRESHOLD_PERCENTILE", "97"))
 DEFAULT_BATCH_SIZE = int(os.getenv("FDR_BATCH_SIZE", "128"))
+DEFAULT_WORKERS = int(os.getenv("FDR_WORKERS", "1"))
+DEFAULT_SHARED_BUFFER = os.getenv("FDR_SHARED_BUFFER", "none")
+SCORE_CHUNK_WINDOWS = int(os.getenv("FDR_SCORE_CHUNK_WINDOWS", "4096"))
+DEFAULT_WINDOW_ENCODING = os.getenv("FDR_WINDOW_ENCODING", "raw")
+WINDOW_ENCODINGS = {"raw", "summary"}
+SUMMARY_STATS = ("mean", "std", "min", "max", "slope", "diff_energy")
+DEFAULT_MULTIRES = os.getenv("FDR_MULTIRES", "0").lower() in {"1", "true", "yes"}
+MULTIRES_FACTOR = int(os.getenv("FDR_MULTIRES_FACTOR", "8"))
+MULTIRES_MARGIN = float(os.getenv("FDR_MULTIRES_MARGIN", "7"))
+MULTIRES_TRAIN_FACTOR = int(os.getenv("FDR_MULTIRES_TRAIN_FACTOR", "1"))
+MULTIRES_MIN_ROWS = int(os.getenv("FDR_MULTIRES_MIN_ROWS", "20000"))
+DEFAULT_WARM_START = os.getenv("FDR_WARM_START", "0").lower() in {"1", "true", "yes"}
+FINE_TUNE_EPOCHS = int(os.getenv("FDR_FINE_TUNE_EPOCHS", "3"))
+FROZEN_LAYERS = int(os.getenv("FDR_FROZEN_LAYERS", "0"))
 SEGMENT_GAP_SECONDS = 2.0
+TOP_DRIVER_COUNT = 5
+REVIEW_SEGMENT_LIMIT = 10
 
 TIME_COLUMNS = {"Session Time", "System Time", "GPS Date & Time"}
 EXCLUDED_COLUMNS = {
@@ -32,19 +78,77 @@ class TimelineData:
     score: List[float]
 
 
+@dataclass
+class WindowScores:
+    backend: "AutoencoderBackend"
+    starts: List[int]
+    errors: np.ndarray
+    feature_errors: np.ndarray
+    scan: Dict[str, object]
+    model: Dict[str, object]
+
+
+@dataclass
+class WarmStart:
+    """Fine-tune from the schema's fleet base model instead of training from scratch."""
+
+    epochs: int = FINE_TUNE_EPOCHS
+    frozen_layers: int = FROZEN_LAYERS
+
+
+@dataclass
+class ScoredRun:
+    """Model output of one run: everything thresholding needs, nothing more."""
+
+    timestamps: np.ndarray
+    timeline_scores: np.ndarray
+    timeline_feature_scores: np.ndarray
+    raw_values: np.ndarray
+    feature_names: List[str]
+    details: Dict[str, object]
+    source_rows: Optional[np.ndarray] = None
+    run_id: Optional[str] = None
+
+
+ProgressCallback = Callable[[str, float], None]
+
+
+def _no_progress(stage: str, fraction: float) -> None:
+    return None
+
+
+def _check_layer_shapes(expected: List[Tuple[int, int]], layers: DenseLayers) -> None:
+    shapes = [tuple(np.shape(weights)) for weights, _ in layers]
+    if shapes != [tuple(shape) for shape in expected]:
+        raise ValueError(f"Layer shapes {shapes} do not match the model's {expected}.")
+
+
 class AutoencoderBackend:
+    # Whether load_layers() can initialize the model before fit().
+    supports_warm_start = False
+
     def __init__(self, input_dim: int) -> None:
         self.input_dim = input_dim
         self.model = None
 
-    def fit(self, data: np.ndarray, epochs: int, batch_size: int) -> None:
+    def fit(self, data: np.ndarray, epochs: int, batch_size: int, frozen_layers: int = 0) -> None:
+        raise NotImplementedError
+
+    def load_layers(self, layers: DenseLayers) -> None:
+        """Initialize from (in, out) dense layers; ValueError if the shapes differ."""
         raise NotImplementedError
 
     def reconstruct(self, data: np.ndarray) -> np.ndarray:
         raise NotImplementedError
 
+    def dense_layers(self) -> Optional[DenseLayers]:
+        """Trained weights as (in, out) dense layers, if the model is a dense stack."""
+        return None
+
 
 class TorchAutoencoder(AutoencoderBackend):
+    supports_warm_start = True
+
     def __init__(self, input_dim: int) -> None:
         super().__init__(input_dim)
         import torch
@@ -65,13 +169,19 @@ class TorchAutoencoder(AutoencoderBackend):
             nn.Linear(128, input_dim),
         )
 
-    def fit(self, data: np.ndarray, epochs: int, batch_size: int) -> None:
+    def _linears(self) -> list:
+        return [layer for layer in self.model if isinstance(layer, self.torch.nn.Linear)]
+
+    def fit(self, data: np.ndarray, epochs: int, batch_size: int, frozen_layers: int = 0) -> None:
         torch = self.torch
         device = torch.device("cpu")
         self.model.to(device)
+        for idx, layer in enumerate(self._linears()):
+            layer.requires_grad_(idx >= frozen_layers)
         dataset = torch.utils.data.TensorDataset(torch.tensor(data, dtype=torch.float32))
         loader = torch.utils.data.DataLoader(dataset, batch_size=batch_size, shuffle=True)
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=1e-3)
+        trainable = [param for param in self.model.parameters() if param.requires_grad]
+        optimizer = torch.optim.Adam(trainable, lr=1e-3)
         loss_fn = torch.nn.MSELoss()
 
         self.model.train()
@@ -93,8 +203,30 @@ class TorchAutoencoder(AutoencoderBackend):
             output = self.model(tensor)
         return output.cpu().numpy()
 
+    def dense_layers(self) -> Optional[DenseLayers]:
+        return [
+            (
+                layer.weight.detach().cpu().numpy().T.copy(),
+                layer.bias.detach().cpu().numpy().copy(),
+            )
+            for layer in self._linears()
+        ]
+
+    def load_layers(self, layers: DenseLayers) -> None:
+        linears = self._linears()
+        _check_layer_shapes(
+            [(layer.in_features, layer.out_features) for layer in linears], layers
+        )
+        torch = self.torch
+        with torch.no_grad():
+            for layer, (weights, bias) in zip(linears, layers):
+                layer.weight.copy_(torch.from_numpy(np.asarray(weights, dtype=np.float32).T))
+                layer.bias.copy_(torch.from_numpy(np.asarray(bias, dtype=np.float32)))
+
 
 class TfAutoencoder(AutoencoderBackend):
+    supports_warm_start = True
+
     def __init__(self, input_dim: int) -> None:
         super().__init__(input_dim)
         import tensorflow as tf
@@ -113,74 +245,132 @@ class TfAutoencoder(AutoencoderBackend):
         )
         self.model.compile(optimizer=tf.keras.optimizers.Adam(1e-3), loss="mse")
 
-    def fit(self, data: np.ndarray, epochs: int, batch_size: int) -> None:
+    def _dense(self) -> list:
+        return [
+            layer for layer in self.model.layers if isinstance(layer, self.tf.keras.layers.Dense)
+        ]
+
+    def fit(self, data: np.ndarray, epochs: int, batch_size: int, frozen_layers: int = 0) -> None:
+        if frozen_layers > 0:
+            for idx, layer in enumerate(self._dense()):
+                layer.trainable = idx >= frozen_layers
+            # Keras only picks up trainable flags when the model is compiled.
+            self.model.compile(optimizer=self.tf.keras.optimizers.Adam(1e-3), loss="mse")
         self.model.fit(data, data, epochs=epochs, batch_size=batch_size, verbose=0)
 
     def reconstruct(self, data: np.ndarray) -> np.ndarray:
         return self.model.predict(data, verbose=0)
 
+    def dense_layers(self) -> Optional[DenseLayers]:
+        return [tuple(layer.get_weights()) for layer in self._dense()]
 
-class PcaAutoencoder(AutoencoderBackend):
-    def __init__(self, input_dim: int, n_components: int) -> None:
-        super().__init__(input_dim)
-        self.model = PCA(n_components=n_components, svd_solver="auto", random_state=42)
+    def load_layers(self, layers: DenseLayers) -> None:
+        dense = self._dense()
+        _check_layer_shapes([tuple(layer.get_weights()[0].shape) for layer in dense], layers)
+        for layer, (weights, bias) in zip(dense, layers):
+            layer.set_weights([np.asarray(weights), np.asarray(bias)])
 
-    def fit(self, data: np.ndarray, epochs: int, batch_size: int) -> None:
-        self.model.fit(data)
+
+class NumpyAutoencoder(AutoencoderBackend):
+    """Inference-only dense stack evaluated with float32 NumPy matmuls."""
+
+    def __init__(self, layers: DenseLayers) -> None:
+        super().__init__(layers[0][0].shape[0])
+        self.layers = [
+            (np.asarray(weights, dtype=np.float32), np.asarray(bias, dtype=np.float32))
+            for weights, bias in layers
+        ]
+
+    def fit(self, data: np.ndarray, epochs: int, batch_size: int, frozen_layers: int = 0) -> None:
+        raise NotImplementedError("Compiled backends are inference-only.")
 
     def reconstruct(self, data: np.ndarray) -> np.ndarray:
-        transformed = self.model.transform(data)
-        return self.model.inverse_transform(transformed)
+        output = np.asarray(data, dtype=np.float32)
+        last = len(self.layers) - 1
+        for idx, (weights, bias) in enumerate(self.layers):
+            output = output @ weights
+            output += bias
+            if idx < last:
+                np.maximum(output, 0.0, out=output)
+        return output
+
+    def dense_layers(self) -> Optional[DenseLayers]:
+        return self.layers
+
+
+class OnnxAutoencoder(NumpyAutoencoder):
+    """Dense stack served by onnxruntime's CPU provider."""
+
+    def __init__(self, layers: DenseLayers, model: Union[bytes, str]) -> None:
+        super().__init__(layers)
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        threads = int(os.getenv("OMP_NUM_THREADS", "0") or 0)
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        model = model if isinstance(model, bytes) else str(model)
+        self.session = onnxruntime.InferenceSession(
+            model, options, providers=["CPUExecutionProvider"]
+        )
+
+    def reconstruct(self, data: np.ndarray) -> np.ndarray:
+        windows = np.ascontiguousarray(data, dtype=np.float32)
+        return self.session.run(None, {"windows": windows})[0]
+
 
+class TorchScriptAutoencoder(NumpyAutoencoder):
+    """Traced, frozen torch module run under ``inference_mode``."""
 
-def _load_data(path: str) -> pd.DataFrame:
-    if path.lower().endswith((".xlsx", ".xls")):
-        return pd.read_excel(path)
-    return pd.read_csv(path)
+    def __init__(self, layers: DenseLayers, module) -> None:
+        super().__init__(layers)
+        import torch
 
+        self.torch = torch
+        self.module = module
 
-def _parse_session_time(series: pd.Series) -> np.ndarray:
-    if pd.api.types.is_numeric_dtype(series):
-        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    @classmethod
+    def trace(cls, backend: TorchAutoencoder) -> "TorchScriptAutoencoder":
+        torch = backend.torch
+        backend.model.eval()
+        traced = torch.jit.trace(backend.model, torch.zeros(1, backend.input_dim))
+        return cls(backend.dense_layers(), torch.jit.freeze(traced))
 
-    as_timedelta = pd.to_timedelta(series, errors="coerce")
-    if not as_timedelta.isna().all():
-        return as_timedelta.dt.total_seconds().to_numpy(dtype=float)
+    @classmethod
+    def load(cls, layers: DenseLayers, path: str) -> "TorchScriptAutoencoder":
+        import torch
 
-    as_datetime = pd.to_datetime(series, errors="coerce")
-    if not as_datetime.isna().all():
-        base = as_datetime.iloc[0]
-        return (as_datetime - base).dt.total_seconds().to_numpy(dtype=float)
+        return cls(layers, torch.jit.load(str(path)))
 
-    raise ValueError("Unable to parse Session Time column to numeric seconds.")
+    def reconstruct(self, data: np.ndarray) -> np.ndarray:
+        torch = self.torch
+        windows = torch.from_numpy(np.ascontiguousarray(data, dtype=np.float32))
+        with torch.inference_mode():
+            return self.module(windows).numpy()
+
+
+class PcaAutoencoder(AutoencoderBackend):
+    def __init__(self, input_dim: int, n_components: int) -> None:
+        super().__init__(input_dim)
+        self.model = PCA(n_components=n_components, svd_solver="auto", random_state=42)
+
+    def fit(self, data: np.ndarray, epochs: int, batch_size: int, frozen_layers: int = 0) -> None:
+        self.model.fit(data)
+
+    def reconstruct(self, data: np.ndarray) -> np.ndarray:
+        transformed = self.model.transform(data)
+        return self.model.inverse_transform(transformed)
 
 
 def _select_numeric_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
-    numeric_columns = {}
-    for column in df.columns:
-        if column in EXCLUDED_COLUMNS or column in TIME_COLUMNS:
-            continue
-        series = pd.to_numeric(df[column], errors="coerce")
-        if series.notna().sum() == 0:
-            continue
-        missing_ratio = series.isna().mean()
-        if missing_ratio > 0.4:
-            continue
-        unique_values = series.dropna().unique()
-        unique_count = unique_values.size
-        if unique_count <= 1:
-            continue
-        if unique_count < 10:
-            continue
-        if set(unique_values).issubset({0, 1}):
-            continue
-        numeric_columns[column] = series
+    return select_numeric_columns(df, excluded=EXCLUDED_COLUMNS | TIME_COLUMNS)
 
-    if not numeric_columns:
-        raise ValueError("No numeric parameters available for anomaly detection.")
 
-    numeric_df = pd.DataFrame(numeric_columns)
-    return numeric_df, list(numeric_columns.keys())
+def _prepare_numeric_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    numeric_df, feature_names = _select_numeric_columns(df)
+    numeric_df = numeric_df.reset_index(drop=True)
+    numeric_df = numeric_df.fillna(method="ffill").fillna(method="bfill")
+    return numeric_df, feature_names
 
 
 def _standardize(features: pd.DataFrame, train_end: int) -> Tuple[pd.DataFrame, pd.Series, pd.Series]:
@@ -191,14 +381,107 @@ def _standardize(features: pd.DataFrame, train_end: int) -> Tuple[pd.DataFrame,
     return standardized, mean, std
 
 
-def _build_windows(values: np.ndarray, window_size: int, stride: int) -> Tuple[np.ndarray, List[int]]:
-    windows = []
-    starts = []
-    for start in range(0, values.shape[0] - window_size + 1, stride):
-        end = start + window_size
-        windows.append(values[start:end])
-        starts.append(start)
-    return np.stack(windows), starts
+def _build_windows(
+    values: np.ndarray,
+    window_size: int,
+    stride: int,
+    buffers: Optional[SharedArrayPool] = None,
+    starts: Optional[List[int]] = None,
+) -> Tuple[np.ndarray, List[int]]:
+    # sliding_window_view is a zero-copy (n, features, window) view; a single
+    # copy lays the selected windows out row-major for the backend.
+    view = sliding_window_view(values, window_size, axis=0)
+    explicit_starts = starts is not None
+    if not explicit_starts:
+        starts = list(range(0, values.shape[0] - window_size + 1, stride))
+    n_features = values.shape[1]
+    if buffers is None:
+        windows = np.empty((len(starts), window_size, n_features), dtype=values.dtype)
+    else:
+        windows, _ = buffers.empty((len(starts), window_size, n_features), values.dtype)
+    if not explicit_starts:
+        np.copyto(windows, view[::stride].transpose(0, 2, 1))
+        return windows, starts
+    # Fancy indexing copies; gathering in chunks keeps that copy cache-sized.
+    for offset in range(0, len(starts), SCORE_CHUNK_WINDOWS):
+        chunk = starts[offset : offset + SCORE_CHUNK_WINDOWS]
+        np.copyto(windows[offset : offset + len(chunk)], view[chunk].transpose(0, 2, 1))
+    return windows, starts
+
+
+def _summary_windows(
+    values: np.ndarray,
+    window_size: int,
+    stride: int,
+    buffers: Optional[SharedArrayPool] = None,
+    starts: Optional[List[int]] = None,
+) -> Tuple[np.ndarray, List[int]]:
+    """Encode each window as per-parameter statistics.
+
+    Returns a (windows, len(SUMMARY_STATS), features) array, laid out like
+    raw windows so the backends and error mapping need no special case.
+    """
+
+    if starts is None:
+        starts = list(range(0, values.shape[0] - window_size + 1, stride))
+    n_features = values.shape[1]
+    shape = (len(starts), len(SUMMARY_STATS), n_features)
+    if buffers is None:
+        encoded = np.empty(shape, dtype=values.dtype)
+    else:
+        encoded, _ = buffers.empty(shape, values.dtype)
+
+    view = sliding_window_view(values, window_size, axis=0)
+    diff_view = sliding_window_view(np.diff(values, axis=0) ** 2, window_size - 1, axis=0)
+    ramp = np.arange(window_size, dtype=float) - (window_size - 1) / 2.0
+    ramp /= np.square(ramp).sum()
+    for offset in range(0, len(starts), SCORE_CHUNK_WINDOWS):
+        chunk = starts[offset : offset + SCORE_CHUNK_WINDOWS]
+        block = view[chunk]
+        out = encoded[offset : offset + len(chunk)]
+        out[:, 0] = block.mean(axis=-1)
+        out[:, 1] = block.std(axis=-1)
+        out[:, 2] = block.min(axis=-1)
+        out[:, 3] = block.max(axis=-1)
+        out[:, 4] = block @ ramp
+        out[:, 5] = diff_view[chunk].mean(axis=-1)
+    return encoded, starts
+
+
+def _window_inputs(
+    values: np.ndarray,
+    window_size: int,
+    stride: int,
+    buffers: Optional[SharedArrayPool],
+    encoding: str,
+    starts: Optional[List[int]] = None,
+) -> Tuple[np.ndarray, List[int]]:
+    if encoding == "summary":
+        return _summary_windows(values, window_size, stride, buffers, starts)
+    return _build_windows(values, window_size, stride, buffers, starts)
+
+
+def _input_scaling(
+    windows: np.ndarray, encoding: str
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # Summary statistics live on different scales (slope and difference
+    # energy are much smaller than the level statistics), so they are
+    # standardized on the training windows. Raw windows are already z-scored.
+    if encoding != "summary" or windows.shape[0] == 0:
+        return None
+    center = windows.mean(axis=0)
+    scale = windows.std(axis=0)
+    scale[scale == 0.0] = 1.0
+    return center, scale
+
+
+def _apply_scaling(
+    windows: np.ndarray, scaling: Optional[Tuple[np.ndarray, np.ndarray]]
+) -> np.ndarray:
+    if scaling is not None:
+        windows -= scaling[0]
+        windows /= scaling[1]
+    return windows
 
 
 def _get_backend(input_dim: int) -> AutoencoderBackend:
@@ -212,6 +495,306 @@ def _get_backend(input_dim: int) -> AutoencoderBackend:
     return PcaAutoencoder(input_dim, n_components)
 
 
+def _reconstruction_errors(
+    backend: AutoencoderBackend,
+    flat_windows: np.ndarray,
+    window_size: int,
+    n_features: int,
+    chunk_size: int = SCORE_CHUNK_WINDOWS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    n_windows = flat_windows.shape[0]
+    window_errors = np.empty(n_windows, dtype=float)
+    window_feature_errors = np.empty((n_windows, n_features), dtype=float)
+    for start in range(0, n_windows, chunk_size):
+        chunk = flat_windows[start : start + chunk_size]
+        squared = (chunk - backend.reconstruct(chunk)) ** 2
+        window_errors[start : start + chunk.shape[0]] = squared.mean(axis=1)
+        window_feature_errors[start : start + chunk.shape[0]] = squared.reshape(
+            chunk.shape[0], window_size, n_features
+        ).mean(axis=1)
+    return window_errors, window_feature_errors
+
+
+def _compile_backend(
+    backend: AutoencoderBackend, runtime: str, entry: Optional[RegistryEntry] = None
+) -> AutoencoderBackend:
+    layers = backend.dense_layers() if runtime != "none" else None
+    if layers is None:
+        return backend
+    if runtime == "torchscript" and isinstance(backend, TorchAutoencoder):
+        return TorchScriptAutoencoder.trace(backend)
+    if runtime in {"onnx", "auto", "torchscript"} and onnx_available():
+        model = entry.onnx_path if entry is not None and entry.onnx_path else build_onnx(layers)
+        return OnnxAutoencoder(layers, model)
+    return NumpyAutoencoder(layers)
+
+
+def _registry_backend(entry: RegistryEntry, runtime: str) -> AutoencoderBackend:
+    if (
+        runtime == "torchscript"
+        and entry.torchscript_path is not None
+        and importlib.util.find_spec("torch") is not None
+    ):
+        return TorchScriptAutoencoder.load(entry.layers, entry.torchscript_path)
+    # Registry weights are always served compiled; "none" means "best available".
+    return _compile_backend(
+        NumpyAutoencoder(entry.layers), "auto" if runtime == "none" else runtime, entry
+    )
+
+
+def _store_backend(
+    backend: AutoencoderBackend, key: str, window_size: int
+) -> Optional[RegistryEntry]:
+    layers = backend.dense_layers()
+    if MODEL_REGISTRY is None or layers is None:
+        return None
+    entry = MODEL_REGISTRY.put(
+        key,
+        layers,
+        {
+            "backend": backend.__class__.__name__,
+            "window_size": int(window_size),
+            "input_dim": int(backend.input_dim),
+        },
+    )
+    if isinstance(backend, TorchAutoencoder):
+        compiled = TorchScriptAutoencoder.trace(backend)
+        path = MODEL_REGISTRY.torchscript_path(key)
+        compiled.torch.jit.save(compiled.module, str(path))
+        entry.torchscript_path = path
+    return entry
+
+
+def _fit_backend(
+    windows: np.ndarray,
+    window_size: int,
+    epochs: int,
+    batch_size: int,
+    progress: ProgressCallback,
+    key: Optional[str] = None,
+    runtime: str = DEFAULT_COMPILED_RUNTIME,
+    warm_start: Optional[WarmStart] = None,
+) -> Tuple[AutoencoderBackend, Dict[str, object]]:
+    if windows.size == 0:
+        raise ValueError("Unable to build windows for anomaly detection.")
+
+    flat_windows = windows.reshape(windows.shape[0], windows.shape[1] * windows.shape[2])
+    progress("training", 0.2)
+    if warm_start is not None:
+        backend, warm_report = _warm_start_backend(flat_windows, batch_size, key, warm_start)
+        if backend is not None:
+            # A flight-adapted model is not a schema model; keep it out of the registry.
+            backend = _compile_backend(backend, runtime)
+            progress("scoring", 0.7)
+            return backend, {
+                "key": key,
+                "registry": "bypassed",
+                "runtime": runtime,
+                "warm_start": warm_report,
+            }
+
+    reuse = MODEL_REGISTRY is not None and REUSE_SCHEMA_MODELS and key is not None
+    entry = MODEL_REGISTRY.get(key) if reuse else None
+    if entry is not None and entry.metadata.get("input_dim") != flat_windows.shape[1]:
+        entry = None
+
+    if entry is not None:
+        backend = _registry_backend(entry, runtime)
+        registry_status = "hit"
+    else:
+        backend = _get_backend(flat_windows.shape[1])
+        backend.fit(flat_windows, epochs=epochs, batch_size=batch_size)
+        entry = _store_backend(backend, key, window_size) if reuse else None
+        if not reuse:
+            registry_status = "off"
+        else:
+            registry_status = "stored" if entry is not None else "skipped"
+        backend = _compile_backend(backend, runtime, entry)
+    progress("scoring", 0.7)
+    model = {"key": key, "registry": registry_status, "runtime": runtime}
+    if warm_start is not None:
+        model["warm_start"] = warm_report
+    return backend, model
+
+
+def _warm_start_backend(
+    flat_windows: np.ndarray, batch_size: int, key: Optional[str], warm_start: WarmStart
+) -> Tuple[Optional[AutoencoderBackend], Dict[str, object]]:
+    """Fine-tune the fleet base model on this flight, or say why it cannot be used."""
+
+    report: Dict[str, object] = {
+        "base": base_model_key(key) if key else None,
+        "epochs": int(warm_start.epochs),
+        "frozen_layers": int(warm_start.frozen_layers),
+    }
+    base = MODEL_REGISTRY.get(base_model_key(key)) if MODEL_REGISTRY is not None and key else None
+    if base is None:
+        return None, dict(report, status="no_base_model")
+    if base.metadata.get("input_dim") != flat_windows.shape[1]:
+        return None, dict(report, status="schema_mismatch")
+    backend = _get_backend(flat_windows.shape[1])
+    if not backend.supports_warm_start:
+        return None, dict(report, status="unsupported_backend")
+    try:
+        backend.load_layers(base.layers)
+    except ValueError:
+        return None, dict(report, status="schema_mismatch")
+    backend.fit(
+        flat_windows,
+        epochs=warm_start.epochs,
+        batch_size=batch_size,
+        frozen_layers=warm_start.frozen_layers,
+    )
+    return backend, dict(report, status="fine_tuned", base_flights=base.metadata.get("flights"))
+
+
+def _score_windows(backend: AutoencoderBackend, windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n_windows, width, n_features = windows.shape
+    return _reconstruction_errors(
+        backend, windows.reshape(n_windows, width * n_features), width, n_features
+    )
+
+
+def _score_exhaustive(
+    values: np.ndarray,
+    window_size: int,
+    stride: int,
+    epochs: int,
+    batch_size: int,
+    buffers: SharedArrayPool,
+    progress: ProgressCallback,
+    key: Optional[str] = None,
+    runtime: str = DEFAULT_COMPILED_RUNTIME,
+    encoding: str = DEFAULT_WINDOW_ENCODING,
+    warm_start: Optional[WarmStart] = None,
+) -> WindowScores:
+    windows, starts = _window_inputs(values, window_size, stride, buffers, encoding)
+    train_window_end = max(1, int(len(starts) * 0.7))
+    _apply_scaling(windows, _input_scaling(windows[:train_window_end], encoding))
+    backend, model = _fit_backend(
+        windows[:train_window_end],
+        window_size,
+        epochs,
+        batch_size,
+        progress,
+        key,
+        runtime,
+        warm_start,
+    )
+    errors, feature_errors = _score_windows(backend, windows)
+    return WindowScores(
+        backend,
+        starts,
+        errors,
+        feature_errors,
+        {"mode": "exhaustive", "windows": len(starts)},
+        model,
+    )
+
+
+def _candidate_rows(
+    n_rows: int, window_size: int, starts: np.ndarray, errors: np.ndarray, relaxed: float
+) -> np.ndarray:
+    # Rows of every coarse window that passes the relaxed threshold; each
+    # full-resolution window touching them is rescored.
+    hits = starts[errors >= relaxed]
+    edges = np.zeros(n_rows + 1, dtype=np.int64)
+    np.add.at(edges, hits, 1)
+    np.add.at(edges, np.minimum(hits + window_size, n_rows), -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+def _score_multires(
+    values: np.ndarray,
+    window_size: int,
+    stride: int,
+    epochs: int,
+    batch_size: int,
+    threshold_percentile: float,
+    buffers: SharedArrayPool,
+    progress: ProgressCallback,
+    key: Optional[str] = None,
+    runtime: str = DEFAULT_COMPILED_RUNTIME,
+    encoding: str = DEFAULT_WINDOW_ENCODING,
+    warm_start: Optional[WarmStart] = None,
+) -> WindowScores:
+    """Coarse-to-fine scan for long recordings.
+
+    The model is trained as in the exhaustive scan (every
+    ``MULTIRES_TRAIN_FACTOR``-th training window) and first run on windows at
+    ``stride * MULTIRES_FACTOR``. Windows at the regular stride are then
+    scored only inside the regions whose coarse error clears a percentile
+    ``MULTIRES_MARGIN`` below the final threshold. Rows outside those regions
+    keep their coarse scores.
+    """
+
+    n_rows = values.shape[0]
+    all_starts = np.arange(0, n_rows - window_size + 1, stride)
+    train_starts = all_starts[: max(1, int(all_starts.size * 0.7))]
+    train_windows, _ = _window_inputs(
+        values,
+        window_size,
+        stride,
+        buffers,
+        encoding,
+        starts=train_starts[:: max(1, MULTIRES_TRAIN_FACTOR)].tolist(),
+    )
+    scaling = _input_scaling(train_windows, encoding)
+    _apply_scaling(train_windows, scaling)
+    backend, model = _fit_backend(
+        train_windows, window_size, epochs, batch_size, progress, key, runtime, warm_start
+    )
+    del train_windows
+
+    # Cap the coarse stride at one window so consecutive coarse windows leave
+    # no gap, and end on a window flush with the last row so the tail after
+    # the last strided start is scored (and can be refined) too.
+    coarse_stride = stride * max(1, min(MULTIRES_FACTOR, window_size // stride))
+    last_start = n_rows - window_size
+    coarse_starts = list(range(0, last_start + 1, coarse_stride))
+    if coarse_starts and coarse_starts[-1] != last_start:
+        coarse_starts.append(last_start)
+    coarse, coarse_starts = _window_inputs(
+        values, window_size, coarse_stride, buffers, encoding, starts=coarse_starts
+    )
+    _apply_scaling(coarse, scaling)
+    coarse_errors, coarse_feature_errors = _score_windows(backend, coarse)
+
+    relaxed = float(np.percentile(coarse_errors, max(0.0, threshold_percentile - MULTIRES_MARGIN)))
+    candidates = _candidate_rows(
+        n_rows, window_size, np.asarray(coarse_starts), coarse_errors, relaxed
+    )
+    covered = np.concatenate(([0], np.cumsum(candidates)))
+    refine = (
+        (covered[all_starts + window_size] > covered[all_starts])
+        & (all_starts % coarse_stride != 0)
+        & (all_starts != last_start)
+    )
+    fine_starts = all_starts[refine].tolist()
+
+    starts = list(coarse_starts)
+    errors = coarse_errors
+    feature_errors = coarse_feature_errors
+    if fine_starts:
+        fine, _ = _window_inputs(values, window_size, stride, buffers, encoding, starts=fine_starts)
+        _apply_scaling(fine, scaling)
+        fine_errors, fine_feature_errors = _score_windows(backend, fine)
+        starts += fine_starts
+        errors = np.concatenate((coarse_errors, fine_errors))
+        feature_errors = np.concatenate((coarse_feature_errors, fine_feature_errors))
+
+    scan = {
+        "mode": "multires",
+        "factor": int(coarse_stride // stride),
+        "train_factor": max(1, MULTIRES_TRAIN_FACTOR),
+        "coarse_windows": len(coarse_starts),
+        "refined_windows": len(fine_starts),
+        "candidate_rows": int(candidates.sum()),
+        "relaxed_threshold": relaxed,
+    }
+    return WindowScores(backend, starts, errors, feature_errors, scan, model)
+
+
 def _map_window_scores(
     n_rows: int,
     window_size: int,
@@ -234,80 +817,64 @@ def _group_segments(
     feature_scores: np.ndarray,
     feature_names: List[str],
     threshold: float,
+    stats: ScoreStats,
+    reused_model: bool = False,
 ) -> List[Dict[str, object]]:
-    if np.allclose(scores, scores[0]):
-        anomaly_mask = np.zeros_like(scores, dtype=bool)
-    else:
-        anomaly_mask = scores >= threshold
-
-    indices = np.where(anomaly_mask)[0]
-    if indices.size == 0:
+    indices = np.where(stats.flag(scores, threshold))[0]
+    runs = group_runs(timestamps, indices, SEGMENT_GAP_SECONDS)
+    if not runs:
         return []
 
-    segments = []
-    start_idx = indices[0]
-    last_idx = indices[0]
+    run_features = np.stack([feature_scores[run].mean(axis=0) for run in runs])
+    drivers = _build_top_drivers(run_features, feature_names)
 
-    def build_segment(segment_indices: np.ndarray) -> Dict[str, object]:
+    segments = []
+    for segment_indices, top_drivers in zip(runs, drivers):
         seg_scores = scores[segment_indices]
-        seg_feature = feature_scores[segment_indices].mean(axis=0)
-        top_drivers = _build_top_drivers(seg_feature, feature_names)
-        explanation = _build_explanation(top_drivers)
-        return {
-            "start_time": float(timestamps[segment_indices[0]]),
-            "end_time": float(timestamps[segment_indices[-1]]),
-            "severity": _score_to_severity(seg_scores.max(), scores, threshold),
-            "score_peak": float(seg_scores.max()),
-            "top_drivers": top_drivers,
-            "explanation": explanation,
-        }
-
-    for idx in indices[1:]:
-        if timestamps[idx] - timestamps[last_idx] <= SEGMENT_GAP_SECONDS:
-            last_idx = idx
-            continue
-        segment_indices = np.arange(start_idx, last_idx + 1)
-        segments.append(build_segment(segment_indices))
-        start_idx = idx
-        last_idx = idx
-
-    segment_indices = np.arange(start_idx, last_idx + 1)
-    segments.append(build_segment(segment_indices))
+        segments.append(
+            {
+                "start_time": float(timestamps[segment_indices[0]]),
+                "end_time": float(timestamps[segment_indices[-1]]),
+                "severity": _score_to_severity(seg_scores.max(), stats, threshold),
+                "score_peak": float(seg_scores.max()),
+                "top_drivers": top_drivers,
+                "explanation": _build_explanation(top_drivers, reused_model),
+            }
+        )
     return segments
 
 
-def _build_top_drivers(feature_scores: np.ndarray, feature_names: List[str]) -> List[Dict[str, object]]:
-    driver_scores = sorted(
-        zip(feature_names, feature_scores),
-        key=lambda item: item[1],
-        reverse=True,
-    )
+def _build_top_drivers(
+    feature_scores: np.ndarray, feature_names: List[str]
+) -> List[List[Dict[str, object]]]:
+    """Top drivers for each row of a (segments, features) score matrix."""
+
+    winners = top_k_indices(feature_scores, TOP_DRIVER_COUNT)
     return [
-        {"parameter": name, "error": float(score)}
-        for name, score in driver_scores[:5]
+        [
+            {"parameter": feature_names[col], "error": float(row_scores[col])}
+            for col in row_winners
+        ]
+        for row_scores, row_winners in zip(feature_scores, winners)
     ]
 
 
-def _build_explanation(top_drivers: List[Dict[str, object]]) -> str:
+def _build_explanation(top_drivers: List[Dict[str, object]], reused_model: bool = False) -> str:
+    if reused_model:
+        sentence = (
+            "Unusual behavior pattern compared to normal behavior learned from an earlier "
+            "flight with the same parameters (reused registry model)."
+        )
+    else:
+        sentence = "Unusual behavior pattern compared to learned normal behavior for this flight."
     top_names = [driver["parameter"] for driver in top_drivers[:3]]
     if top_names:
-        joined = ", ".join(top_names)
-        return (
-            f"Unusual behavior pattern compared to learned normal behavior for this flight. "
-            f"Top drivers: {joined}."
-        )
-    return "Unusual behavior pattern compared to learned normal behavior for this flight."
+        return f"{sentence} Top drivers: {', '.join(top_names)}."
+    return sentence
 
 
-def _score_to_severity(score: float, scores: np.ndarray, high_threshold: float) -> str:
-    if np.allclose(scores, scores[0]):
-        return "low"
-    medium_threshold = np.percentile(scores, 90)
-    if score >= high_threshold:
-        return "high"
-    if score >= medium_threshold:
-        return "med"
-    return "low"
+def _score_to_severity(score: float, stats: ScoreStats, high_threshold: float) -> str:
+    return stats.severity(score, high_threshold)
 
 
 def _extract_unit(parameter: str) -> str:
@@ -326,32 +893,159 @@ def _build_review_segments(
     scores: np.ndarray,
     feature_scores: np.ndarray,
     feature_names: List[str],
-    limit: int = 10,
+    limit: int = REVIEW_SEGMENT_LIMIT,
+    reused_model: bool = False,
 ) -> List[Dict[str, object]]:
-    order = np.argsort(scores)[::-1]
-    seen = set()
-    segments = []
-    for idx in order:
-        if len(segments) >= limit:
-            break
-        if idx in seen:
+    rows = top_k_indices(scores, limit)
+    drivers = _build_top_drivers(feature_scores[rows], feature_names)
+    return [
+        {
+            "start_time": float(timestamps[idx]),
+            "end_time": float(timestamps[idx]),
+            "severity": "low",
+            "score_peak": float(scores[idx]),
+            "top_drivers": top_drivers,
+            "explanation": "Review recommended. "
+            + _build_explanation(top_drivers, reused_model),
+        }
+        for idx, top_drivers in zip(rows, drivers)
+    ]
+
+
+def _baseline_stats(
+    values: np.ndarray, baseline_mask: np.ndarray, columns: List[int]
+) -> Dict[int, Dict[str, float]]:
+    baseline_values = values[baseline_mask]
+    if baseline_values.shape[0] == 0:
+        baseline_values = values
+
+    stats: Dict[int, Dict[str, float]] = {}
+    for column in columns:
+        column_values = np.asarray(baseline_values[:, column], dtype=float)
+        if column_values.size == 0:
             continue
-        seen.add(idx)
-        top_drivers = _build_top_drivers(feature_scores[idx], feature_names)
-        explanation = (
-            "Review recommended. " + _build_explanation(top_drivers)
-        )
-        segments.append(
-            {
-                "start_time": float(timestamps[idx]),
-                "end_time": float(timestamps[idx]),
-                "severity": "low",
-                "score_peak": float(scores[idx]),
-                "top_drivers": top_drivers,
-                "explanation": explanation,
-            }
-        )
-    return segments
+        stats[column] = {
+            "baseline_p5": float(np.percentile(column_values, 5)),
+            "baseline_p95": float(np.percentile(column_values, 95)),
+            "baseline_median": float(np.median(column_values)),
+        }
+    return stats
+
+
+def _segment_extrema(
+    values: np.ndarray,
+    timestamps: np.ndarray,
+    start_time: float,
+    end_time: float,
+    columns: List[int],
+) -> List[Optional[Tuple[float, float]]]:
+    segment_mask = (timestamps >= start_time) & (timestamps <= end_time)
+    segment_values = values[segment_mask]
+    extrema: List[Optional[Tuple[float, float]]] = []
+    for column in columns:
+        column_values = np.asarray(segment_values[:, column], dtype=float)
+        if column_values.size == 0:
+            extrema.append(None)
+            continue
+        extrema.append((float(np.min(column_values)), float(np.max(column_values))))
+    return extrema
+
+
+def _baseline_stats_task(
+    values_spec: SharedArraySpec, mask_spec: SharedArraySpec, columns: List[int]
+) -> Dict[int, Dict[str, float]]:
+    return _baseline_stats(attach(values_spec), attach(mask_spec), columns)
+
+
+def _segment_extrema_task(
+    values_spec: SharedArraySpec,
+    timestamps_spec: SharedArraySpec,
+    start_time: float,
+    end_time: float,
+    columns: List[int],
+) -> List[Optional[Tuple[float, float]]]:
+    return _segment_extrema(
+        attach(values_spec), attach(timestamps_spec), start_time, end_time, columns
+    )
+
+
+def _attach_driver_stats(
+    segments: List[Dict[str, object]],
+    raw_values: np.ndarray,
+    timestamps: np.ndarray,
+    flagged_mask: np.ndarray,
+    feature_names: List[str],
+    buffers: SharedArrayPool,
+    workers: int,
+) -> None:
+    column_index = {name: idx for idx, name in enumerate(feature_names)}
+    segment_jobs = []
+    for segment in segments:
+        start_time = segment.get("start_time")
+        end_time = segment.get("end_time")
+        if start_time is None or end_time is None:
+            continue
+        names = [
+            driver.get("parameter")
+            for driver in segment.get("top_drivers", [])
+            if driver.get("parameter") in column_index
+        ]
+        segment_jobs.append((segment, start_time, end_time, names))
+
+    all_columns = list(range(len(feature_names)))
+    if workers > 1 and buffers.shared:
+        raw_values, values_spec = buffers.share(raw_values)
+        timestamps, timestamps_spec = buffers.share(timestamps)
+        _, mask_spec = buffers.share(~flagged_mask)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            column_groups = [all_columns[idx::workers] for idx in range(workers)]
+            baseline_futures = [
+                executor.submit(_baseline_stats_task, values_spec, mask_spec, group)
+                for group in column_groups
+                if group
+            ]
+            extrema_futures = [
+                executor.submit(
+                    _segment_extrema_task,
+                    values_spec,
+                    timestamps_spec,
+                    start_time,
+                    end_time,
+                    [column_index[name] for name in names],
+                )
+                for _, start_time, end_time, names in segment_jobs
+            ]
+            baseline_by_column: Dict[int, Dict[str, float]] = {}
+            for future in baseline_futures:
+                baseline_by_column.update(future.result())
+            segment_extrema = [future.result() for future in extrema_futures]
+    else:
+        baseline_by_column = _baseline_stats(raw_values, ~flagged_mask, all_columns)
+        segment_extrema = [
+            _segment_extrema(
+                raw_values, timestamps, start_time, end_time, [column_index[name] for name in names]
+            )
+            for _, start_time, end_time, names in segment_jobs
+        ]
+
+    for (segment, _, _, names), extrema in zip(segment_jobs, segment_extrema):
+        driver_stats = []
+        for name, bounds in zip(names, extrema):
+            if bounds is None:
+                continue
+            baseline = baseline_by_column.get(column_index[name], {})
+            driver_stats.append(
+                {
+                    "param": name,
+                    "unit": _extract_unit(name),
+                    "segment_min": bounds[0],
+                    "segment_max": bounds[1],
+                    "baseline_p5": baseline.get("baseline_p5"),
+                    "baseline_p95": baseline.get("baseline_p95"),
+                    "baseline_median": baseline.get("baseline_median"),
+                }
+            )
+        segment["driver_stats"] = driver_stats
 
 
 def detect_anomalies(
@@ -362,19 +1056,126 @@ def detect_anomalies(
     threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
     batch_size: int = DEFAULT_BATCH_SIZE,
     debug: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    shared_buffer: str = DEFAULT_SHARED_BUFFER,
+    progress: Optional[ProgressCallback] = None,
+    multires: bool = DEFAULT_MULTIRES,
+    compiled_runtime: str = DEFAULT_COMPILED_RUNTIME,
+    window_encoding: str = DEFAULT_WINDOW_ENCODING,
+    prune_redundant: bool = DEFAULT_PRUNE_CHANNELS,
+    flight_id: Optional[str] = None,
+    case_id: Optional[str] = None,
+    resample_hz: float = DEFAULT_RESAMPLE_HZ,
+    warm_start: bool = DEFAULT_WARM_START,
+    fine_tune_epochs: int = FINE_TUNE_EPOCHS,
+    frozen_layers: int = FROZEN_LAYERS,
 ) -> Dict[str, object]:
-    df = _load_data(path)
-    if "Session Time" not in df.columns:
-        raise ValueError("Input file must include a 'Session Time' column.")
+    return detect_frame(
+        load_flight(path),
+        window_size=window_size,
+        stride=stride,
+        epochs=epochs,
+        threshold_percentile=threshold_percentile,
+        batch_size=batch_size,
+        debug=debug,
+        workers=workers,
+        shared_buffer=shared_buffer,
+        progress=progress,
+        multires=multires,
+        compiled_runtime=compiled_runtime,
+        window_encoding=window_encoding,
+        prune_redundant=prune_redundant,
+        flight_id=flight_id,
+        case_id=case_id,
+        resample_hz=resample_hz,
+        warm_start=warm_start,
+        fine_tune_epochs=fine_tune_epochs,
+        frozen_layers=frozen_layers,
+    )
 
-    timestamps = _parse_session_time(df["Session Time"])
-    order = np.argsort(timestamps)
-    df = df.iloc[order].reset_index(drop=True)
-    timestamps = timestamps[order]
 
-    numeric_df, feature_names = _select_numeric_columns(df)
-    numeric_df = numeric_df.reset_index(drop=True)
-    numeric_df = numeric_df.fillna(method="ffill").fillna(method="bfill")
+def detect_frame(
+    frame: FlightFrame,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    stride: int = DEFAULT_STRIDE,
+    epochs: int = DEFAULT_EPOCHS,
+    threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    debug: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    shared_buffer: str = DEFAULT_SHARED_BUFFER,
+    progress: Optional[ProgressCallback] = None,
+    multires: bool = DEFAULT_MULTIRES,
+    compiled_runtime: str = DEFAULT_COMPILED_RUNTIME,
+    window_encoding: str = DEFAULT_WINDOW_ENCODING,
+    prune_redundant: bool = DEFAULT_PRUNE_CHANNELS,
+    flight_id: Optional[str] = None,
+    case_id: Optional[str] = None,
+    resample_hz: float = DEFAULT_RESAMPLE_HZ,
+    warm_start: bool = DEFAULT_WARM_START,
+    fine_tune_epochs: int = FINE_TUNE_EPOCHS,
+    frozen_layers: int = FROZEN_LAYERS,
+) -> Dict[str, object]:
+    if workers > 1 and shared_buffer == "none":
+        shared_buffer = "shm"
+    if compiled_runtime not in COMPILED_RUNTIMES:
+        raise ValueError(
+            f"Unknown compiled runtime {compiled_runtime!r}; "
+            f"expected one of {sorted(COMPILED_RUNTIMES)}."
+        )
+    if window_encoding not in WINDOW_ENCODINGS:
+        raise ValueError(
+            f"Unknown window encoding {window_encoding!r}; "
+            f"expected one of {sorted(WINDOW_ENCODINGS)}."
+        )
+    frame = resample_frame(frame, resample_hz)
+
+    with SharedArrayPool(shared_buffer) as buffers:
+        return _detect_anomalies(
+            frame,
+            window_size=window_size,
+            stride=stride,
+            epochs=epochs,
+            threshold_percentile=threshold_percentile,
+            batch_size=batch_size,
+            debug=debug,
+            workers=workers,
+            buffers=buffers,
+            progress=progress or _no_progress,
+            multires=multires,
+            compiled_runtime=compiled_runtime,
+            window_encoding=window_encoding,
+            prune_redundant=prune_redundant,
+            flight_id=flight_id,
+            case_id=case_id,
+            warm_start=WarmStart(fine_tune_epochs, frozen_layers) if warm_start else None,
+        )
+
+
+def _detect_anomalies(
+    frame: FlightFrame,
+    window_size: int,
+    stride: int,
+    epochs: int,
+    threshold_percentile: float,
+    batch_size: int,
+    debug: bool,
+    workers: int,
+    buffers: SharedArrayPool,
+    progress: ProgressCallback,
+    multires: bool,
+    compiled_runtime: str,
+    window_encoding: str,
+    prune_redundant: bool,
+    flight_id: Optional[str],
+    case_id: Optional[str],
+    warm_start: Optional[WarmStart],
+) -> Dict[str, object]:
+    progress("preparing", 0.1)
+    timestamps = frame.timestamps
+    numeric_df, feature_names = frame.cached(
+        "autoencoder.numeric", lambda: _prepare_numeric_frame(frame.data)
+    )
 
     n_rows = numeric_df.shape[0]
     if n_rows == 0:
@@ -386,56 +1187,147 @@ def detect_anomalies(
 
     train_end = max(1, int(n_rows * 0.7))
     standardized, mean, std = _standardize(numeric_df, train_end)
-    values = standardized.to_numpy(dtype=float)
-
-    windows, starts = _build_windows(values, window_size, stride)
-    if windows.size == 0:
-        raise ValueError("Unable to build windows for anomaly detection.")
-
-    n_windows, _, n_features = windows.shape
-    flat_windows = windows.reshape(n_windows, window_size * n_features)
-
-    train_window_end = max(1, int(n_windows * 0.7))
-    backend = _get_backend(flat_windows.shape[1])
-    backend.fit(flat_windows[:train_window_end], epochs=epochs, batch_size=batch_size)
-    reconstructed = backend.reconstruct(flat_windows)
-
-    window_errors = np.mean((flat_windows - reconstructed) ** 2, axis=1)
-    window_feature_errors = ((flat_windows - reconstructed) ** 2).reshape(
-        n_windows, window_size, n_features
-    ).mean(axis=1)
+    model_values = standardized.to_numpy(dtype=float)
+    model_names = feature_names
+    pruning = None
+    if prune_redundant:
+        pruning = prune_channels(model_values[:train_end], feature_names)
+        column_index = {name: idx for idx, name in enumerate(feature_names)}
+        model_names = pruning.representatives
+        model_values = model_values[:, [column_index[name] for name in model_names]]
+    values, _ = buffers.share(model_values)
+
+    key = model_key(model_names, window_size, window_encoding)
+    if multires and n_rows >= MULTIRES_MIN_ROWS:
+        scored = _score_multires(
+            values,
+            window_size,
+            stride,
+            epochs,
+            batch_size,
+            threshold_percentile,
+            buffers,
+            progress,
+            key,
+            compiled_runtime,
+            window_encoding,
+            warm_start,
+        )
+    else:
+        scored = _score_exhaustive(
+            values,
+            window_size,
+            stride,
+            epochs,
+            batch_size,
+            buffers,
+            progress,
+            key,
+            compiled_runtime,
+            window_encoding,
+            warm_start,
+        )
+    backend = scored.backend
 
     timeline_scores, timeline_feature_scores = _map_window_scores(
-        n_rows, window_size, starts, window_errors, window_feature_errors
+        n_rows, window_size, scored.starts, scored.errors, scored.feature_errors
+    )
+    if pruning is not None:
+        # Every cluster member inherits its representative's error, so
+        # explanations still name the parameter the investigator knows.
+        timeline_feature_scores = timeline_feature_scores[:, pruning.member_index(feature_names)]
+
+    run = ScoredRun(
+        timestamps=timestamps,
+        timeline_scores=timeline_scores,
+        timeline_feature_scores=timeline_feature_scores,
+        raw_values=numeric_df.to_numpy(dtype=float),
+        feature_names=feature_names,
+        details={
+            "window_size": int(window_size),
+            "stride": int(stride),
+            "epochs": int(epochs),
+            "backend": backend.__class__.__name__,
+            "window_encoding": window_encoding,
+            "pruning": pruning.describe() if pruning is not None else None,
+            "scan": scored.scan,
+            "model": scored.model,
+            "mean": mean.to_dict(),
+            "std": std.to_dict(),
+            "flight_id": flight_id,
+            "case_id": case_id,
+            "header": [str(column) for column in frame.data.columns],
+            "resampling": describe_resampling(frame),
+        },
+        source_rows=frame.source_rows,
     )
+    if RUN_CACHE is not None:
+        run.run_id = _save_run(RUN_CACHE, run)
+        TimelinePyramid.build(
+            timestamps, timeline_scores, timeline_feature_scores, feature_names
+        ).save(RUN_CACHE.path(run.run_id, PYRAMID_SUFFIX))
+
+    progress("segmenting", 0.85)
+    payload = _build_payload(run, threshold_percentile, debug, workers, buffers)
+    if SEGMENT_INDEX is not None and flight_id is not None:
+        # Only threshold-crossing segments are detections; the low-severity
+        # "review recommended" fallback rows must not surface fleet-wide.
+        index_segments(
+            run.details["header"],
+            feature_names,
+            timestamps,
+            timeline_feature_scores,
+            [segment for segment in payload["segments"] if segment["severity"] == "high"],
+            flight_id,
+            case_id=case_id,
+            run_id=run.run_id,
+        )
+    return payload
 
-    threshold = np.percentile(timeline_scores, threshold_percentile) if n_rows > 0 else 0.0
+
+def _build_payload(
+    run: ScoredRun,
+    threshold_percentile: float,
+    debug: bool,
+    workers: int,
+    buffers: SharedArrayPool,
+) -> Dict[str, object]:
+    timestamps = run.timestamps
+    timeline_scores = run.timeline_scores
+    timeline_feature_scores = run.timeline_feature_scores
+    feature_names = run.feature_names
+    details = run.details
+    n_rows = timeline_scores.shape[0]
+
+    stats = ScoreStats.from_scores(
+        timeline_scores, (MEDIUM_SEVERITY_PERCENTILE, threshold_percentile)
+    )
+    threshold = stats.quantile(threshold_percentile) if n_rows > 0 else 0.0
+    model = details.get("model") or {}
+    reused_model = model.get("registry") == "hit"
     segments = _group_segments(
-        timestamps, timeline_scores, timeline_feature_scores, feature_names, threshold
+        timestamps,
+        timeline_scores,
+        timeline_feature_scores,
+        feature_names,
+        threshold,
+        stats,
+        reused_model,
     )
 
     if not segments:
         segments = _build_review_segments(
-            timestamps, timeline_scores, timeline_feature_scores, feature_names
+            timestamps,
+            timeline_scores,
+            timeline_feature_scores,
+            feature_names,
+            reused_model=reused_model,
         )
+    attach_source_rows(segments, timestamps, run.source_rows)
 
-    driver_counts: Dict[str, int] = {}
-    for segment in segments:
-        for driver in segment.get("top_drivers", []):
-            name = driver.get("parameter")
-            if not name:
-                continue
-            driver_counts[name] = driver_counts.get(name, 0) + 1
+    top_parameters = rank_top_parameters(segments)
 
-    top_parameters = [
-        {"parameter": name, "count": count}
-        for name, count in sorted(driver_counts.items(), key=lambda item: item[1], reverse=True)
-    ]
-
-    if np.allclose(timeline_scores, timeline_scores[0]):
-        flagged_mask = np.zeros_like(timeline_scores, dtype=bool)
-    else:
-        flagged_mask = timeline_scores >= threshold
+    flagged_mask = stats.flag(timeline_scores, threshold)
 
     for segment in segments:
         start_time = segment.get("start_time")
@@ -444,49 +1336,15 @@ def detect_anomalies(
             continue
         flagged_mask |= (timestamps >= start_time) & (timestamps <= end_time)
 
-    baseline_mask = ~flagged_mask
-    baseline_df = numeric_df[baseline_mask]
-    if baseline_df.empty:
-        baseline_df = numeric_df
-
-    baseline_stats: Dict[str, Dict[str, float]] = {}
-    for name in feature_names:
-        values = baseline_df[name].to_numpy(dtype=float)
-        if values.size == 0:
-            continue
-        baseline_stats[name] = {
-            "baseline_p5": float(np.percentile(values, 5)),
-            "baseline_p95": float(np.percentile(values, 95)),
-            "baseline_median": float(np.median(values)),
-        }
-
-    for segment in segments:
-        start_time = segment.get("start_time")
-        end_time = segment.get("end_time")
-        if start_time is None or end_time is None:
-            continue
-        segment_mask = (timestamps >= start_time) & (timestamps <= end_time)
-        driver_stats = []
-        for driver in segment.get("top_drivers", []):
-            name = driver.get("parameter")
-            if not name or name not in numeric_df.columns:
-                continue
-            segment_values = numeric_df.loc[segment_mask, name].to_numpy(dtype=float)
-            if segment_values.size == 0:
-                continue
-            baseline = baseline_stats.get(name, {})
-            driver_stats.append(
-                {
-                    "param": name,
-                    "unit": _extract_unit(name),
-                    "segment_min": float(np.min(segment_values)),
-                    "segment_max": float(np.max(segment_values)),
-                    "baseline_p5": baseline.get("baseline_p5"),
-                    "baseline_p95": baseline.get("baseline_p95"),
-                    "baseline_median": baseline.get("baseline_median"),
-                }
-            )
-        segment["driver_stats"] = driver_stats
+    _attach_driver_stats(
+        segments,
+        run.raw_values,
+        timestamps,
+        flagged_mask,
+        feature_names,
+        buffers,
+        workers,
+    )
 
     flagged_row_count = int(flagged_mask.sum())
     flagged_percent = (flagged_row_count / n_rows) * 100 if n_rows else 0.0
@@ -498,11 +1356,15 @@ def detect_anomalies(
         "top_parameters": top_parameters,
         "flaggedRowCount": flagged_row_count,
         "flaggedPercent": round(flagged_percent, 4),
-        "window_size": int(window_size),
-        "stride": int(stride),
+        "window_size": int(details["window_size"]),
+        "stride": int(details["stride"]),
         "threshold_percentile": float(threshold_percentile),
         "threshold_value": float(threshold),
     }
+    if details.get("resampling"):
+        summary["resampling"] = details["resampling"]
+    if reused_model:
+        summary["model_reuse"] = {"registry_key": model.get("key"), "trained_on_this_flight": False}
 
     timeline = TimelineData(
         time=timestamps.astype(float).round(4).tolist(),
@@ -514,23 +1376,107 @@ def detect_anomalies(
         "segments": segments,
         "timeline": timeline.__dict__,
     }
+    if run.run_id is not None:
+        payload["run_id"] = run.run_id
 
     if debug:
         payload["debugInfo"] = {
             "columns_used": feature_names,
             "threshold": float(threshold),
-            "max_score": float(np.max(timeline_scores) if timeline_scores.size else 0.0),
-            "window_size": int(window_size),
-            "stride": int(stride),
-            "epochs": int(epochs),
-            "backend": backend.__class__.__name__,
-            "mean": mean.to_dict(),
-            "std": std.to_dict(),
+            "max_score": stats.maximum,
+            "window_size": details["window_size"],
+            "stride": details["stride"],
+            "epochs": details["epochs"],
+            "backend": details["backend"],
+            "workers": int(workers),
+            "shared_buffer": buffers.mode,
+            "window_encoding": details["window_encoding"],
+            "pruning": details["pruning"],
+            "scan": details["scan"],
+            "model": details["model"],
+            "mean": details["mean"],
+            "std": details["std"],
         }
 
     return payload
 
 
-def detect_to_json(path: str, debug: bool = False) -> str:
-    payload = detect_anomalies(path, debug=debug)
+def _save_run(cache: RunCache, run: ScoredRun) -> str:
+    arrays = {
+        "timestamps": run.timestamps,
+        "timeline_scores": run.timeline_scores,
+        "timeline_feature_scores": run.timeline_feature_scores,
+        "raw_values": run.raw_values,
+    }
+    if run.source_rows is not None:
+        arrays["source_rows"] = run.source_rows
+    return cache.save(
+        arrays,
+        {
+            "detector": "autoencoder",
+            "feature_names": run.feature_names,
+            "details": run.details,
+        },
+    )
+
+
+def resegment(
+    run_id: str,
+    threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
+    debug: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    shared_buffer: str = DEFAULT_SHARED_BUFFER,
+) -> Dict[str, object]:
+    """Rebuild segments and summary of a cached run at a new threshold.
+
+    Only thresholding, segment grouping, severity and driver statistics are
+    recomputed; the model is not refit or rerun.
+    """
+
+    if RUN_CACHE is None:
+        raise ValueError("Re-segmenting needs FDR_RUN_CACHE_DIR to be set.")
+    arrays, stored = RUN_CACHE.load(run_id)
+    if stored.get("detector") != "autoencoder":
+        raise ValueError(f"Run {run_id!r} was not produced by the autoencoder detector.")
+    run = ScoredRun(
+        timestamps=arrays["timestamps"],
+        timeline_scores=arrays["timeline_scores"],
+        timeline_feature_scores=arrays["timeline_feature_scores"],
+        raw_values=arrays["raw_values"],
+        feature_names=list(stored["feature_names"]),
+        details=stored["details"],
+        source_rows=arrays.get("source_rows"),
+        run_id=run_id,
+    )
+    if workers > 1 and shared_buffer == "none":
+        shared_buffer = "shm"
+    with SharedArrayPool(shared_buffer) as buffers:
+        return _build_payload(run, threshold_percentile, debug, workers, buffers)
+
+
+def resegment_to_json(run_id: str, threshold_percentile: float, debug: bool = False) -> str:
+    payload = resegment(run_id, threshold_percentile=threshold_percentile, debug=debug)
+    return json.dumps(payload, indent=2)
+
+
+def detect_to_json(
+    path: str,
+    debug: bool = False,
+    multires: bool = DEFAULT_MULTIRES,
+    threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
+    flight_id: Optional[str] = None,
+    case_id: Optional[str] = None,
+    resample_hz: float = DEFAULT_RESAMPLE_HZ,
+    warm_start: bool = DEFAULT_WARM_START,
+) -> str:
+    payload = detect_anomalies(
+        path,
+        debug=debug,
+        multires=multires,
+        threshold_percentile=threshold_percentile,
+        flight_id=flight_id,
+        case_id=case_id,
+        resample_hz=resample_hz,
+        warm_start=warm_start,
+    )
     return json.dumps(payload, indent=2)
@@ -6,6 +6,17 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 
+from services.fdr_anomaly.flight import FlightFrame, group_runs, load_flight
+from services.fdr_anomaly.pyramid import PYRAMID_SUFFIX, TimelinePyramid
+from services.fdr_anomaly.resample import (
+    DEFAULT_RESAMPLE_HZ,
+    attach_source_rows,
+    describe_resampling,
+    resample_frame,
+)
+from services.fdr_anomaly.stage_cache import RUN_CACHE
+from services.fdr_anomaly.topk import rank_top_parameters
+
 
 MAD_Z_THRESHOLD = 8.0
 ROLLING_WINDOW = 51
@@ -29,31 +40,6 @@ class TimelineData:
     is_anomaly: List[bool]
 
 
-def _load_data(path: str) -> pd.DataFrame:
-    if path.lower().endswith((".xlsx", ".xls")):
-        return pd.read_excel(path)
-    return pd.read_csv(path)
-
-
-def _parse_session_time(series: pd.Series) -> np.ndarray:
-    if pd.api.types.is_numeric_dtype(series):
-        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
-        return values
-
-    as_timedelta = pd.to_timedelta(series, errors="coerce")
-    if not as_timedelta.isna().all():
-        seconds = as_timedelta.dt.total_seconds().to_numpy(dtype=float)
-        return seconds
-
-    as_datetime = pd.to_datetime(series, errors="coerce")
-    if not as_datetime.isna().all():
-        base = as_datetime.iloc[0]
-        seconds = (as_datetime - base).dt.total_seconds().to_numpy(dtype=float)
-        return seconds
-
-    raise ValueError("Unable to parse Session Time column to numeric seconds.")
-
-
 def _numeric_parameters(df: pd.DataFrame, time_column: str) -> pd.DataFrame:
     excluded = {time_column, *TIME_COLUMNS, *EXCLUDED_COLUMNS}
     drop_columns = [col for col in excluded if col in df.columns]
@@ -102,13 +88,6 @@ def _group_segments(
     combined_score: np.ndarray,
 ) -> List[Dict[str, object]]:
     indices = np.where(anomaly_mask)[0]
-    if indices.size == 0:
-        return []
-
-    segments = []
-    start_idx = indices[0]
-    last_idx = indices[0]
-
 
     def build_explanation(top_drivers: List[Dict[str, float]]) -> str:
         driver_summary = ", ".join(
@@ -147,28 +126,24 @@ def _group_segments(
             "explanation": build_explanation(top_drivers),
         }
 
-    for idx in indices[1:]:
-        if timestamps[idx] - timestamps[last_idx] <= SEGMENT_GAP_SECONDS:
-            last_idx = idx
-            continue
-        segment_indices = np.arange(start_idx, last_idx + 1)
-        segments.append(build_segment(segment_indices))
-        start_idx = idx
-        last_idx = idx
+    return [
+        build_segment(segment_indices)
+        for segment_indices in group_runs(timestamps, indices, SEGMENT_GAP_SECONDS)
+    ]
 
-    segment_indices = np.arange(start_idx, last_idx + 1)
-    segments.append(build_segment(segment_indices))
-    return segments
 
+def detect_anomalies(path: str, resample_hz: float = DEFAULT_RESAMPLE_HZ) -> Dict[str, object]:
+    return detect_frame(load_flight(path), resample_hz=resample_hz)
 
-def detect_anomalies(path: str) -> Dict[str, object]:
-    df = _load_data(path)
-    if "Session Time" not in df.columns:
-        raise ValueError("Input file must include a 'Session Time' column.")
 
-    timestamps = _parse_session_time(df["Session Time"])
-    numeric_df = _numeric_parameters(df, "Session Time")
-    numeric_df = numeric_df.reset_index(drop=True)
+def detect_frame(frame: FlightFrame, resample_hz: float = DEFAULT_RESAMPLE_HZ) -> Dict[str, object]:
+    frame = resample_frame(frame, resample_hz)
+    df = frame.data
+    timestamps = frame.timestamps
+    numeric_df = frame.cached(
+        "detect.numeric",
+        lambda: _numeric_parameters(df, "Session Time").reset_index(drop=True),
+    )
 
     robust_z, max_z = _rolling_mad_zscores(numeric_df)
     scaled = _robust_scale(numeric_df)
@@ -178,18 +153,8 @@ def detect_anomalies(path: str) -> Dict[str, object]:
     anomaly_mask = (max_z.to_numpy() >= MAD_Z_THRESHOLD) | (iforest_pred == -1)
 
     segments = _group_segments(timestamps, anomaly_mask, robust_z, combined_score)
-    driver_counts: Dict[str, int] = {}
-    for segment in segments:
-        for driver in segment.get("top_drivers", []):
-            name = driver.get("parameter")
-            if not name:
-                continue
-            driver_counts[name] = driver_counts.get(name, 0) + 1
-
-    top_parameters = [
-        {"parameter": name, "count": count}
-        for name, count in sorted(driver_counts.items(), key=lambda item: item[1], reverse=True)
-    ]
+    attach_source_rows(segments, timestamps, frame.source_rows)
+    top_parameters = rank_top_parameters(segments)
 
     timeline = TimelineData(
         timestamps=timestamps.tolist(),
@@ -209,12 +174,29 @@ def detect_anomalies(path: str) -> Dict[str, object]:
         "iforest_contamination": IFOREST_CONTAMINATION,
         "top_parameters": top_parameters,
     }
+    resampling = describe_resampling(frame)
+    if resampling is not None:
+        summary["resampling"] = resampling
 
-    return {
+    payload = {
         "summary": summary,
         "segments": segments,
         "timeline": timeline.__dict__,
     }
+    if RUN_CACHE is not None:
+        feature_names = [str(name) for name in numeric_df.columns]
+        run_id = RUN_CACHE.save(
+            {"timestamps": np.asarray(timestamps, dtype=float), "combined_score": combined_score},
+            {"detector": "mad_iforest", "feature_names": feature_names},
+        )
+        TimelinePyramid.build(
+            timestamps,
+            combined_score,
+            robust_z.abs().to_numpy(dtype=float),
+            feature_names,
+        ).save(RUN_CACHE.path(run_id, PYRAMID_SUFFIX))
+        payload["run_id"] = run_id
+    return payload
 
 
 def detect_to_json(path: str) -> str:
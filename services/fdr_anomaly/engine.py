@@ -0,0 +1,114 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from services.fdr_anomaly import autoencoder, detect
+from services.fdr_anomaly.flight import FlightFrame, load_flight
+
+
+Detector = Callable[..., Dict[str, object]]
+
+DETECTORS: Dict[str, Detector] = {}
+
+
+def register_detector(name: str, detector: Optional[Detector] = None):
+    """Register ``detector(frame, **options)`` under ``name``.
+
+    Usable directly or as a decorator.
+    """
+
+    def decorator(func: Detector) -> Detector:
+        DETECTORS[name] = func
+        return func
+
+    if detector is not None:
+        return decorator(detector)
+    return decorator
+
+
+register_detector("autoencoder", autoencoder.detect_frame)
+register_detector("mad_iforest", detect.detect_frame)
+
+
+@register_detector("python_model")
+def _pretrained_iforest(frame: FlightFrame, **options) -> Dict[str, object]:
+    # Imported lazily so the engine works without the trained artifacts.
+    from services.fdr_anomaly import pretrained
+
+    return pretrained.detect_frame(frame, **options)
+
+
+def run_detectors(
+    frame: FlightFrame,
+    detectors: Optional[Iterable[str]] = None,
+    parallel: bool = False,
+    options: Optional[Dict[str, Dict[str, object]]] = None,
+) -> Dict[str, object]:
+    names = list(detectors) if detectors is not None else list(DETECTORS)
+    unknown = [name for name in names if name not in DETECTORS]
+    if unknown:
+        raise ValueError(
+            f"Unknown detector(s): {', '.join(unknown)}. Available: {', '.join(DETECTORS)}."
+        )
+    options = options or {}
+
+    def run(name: str) -> Dict[str, object]:
+        started = time.perf_counter()
+        payload = DETECTORS[name](frame, **options.get(name, {}))
+        return {"payload": payload, "seconds": time.perf_counter() - started}
+
+    outcomes: Dict[str, Dict[str, object]] = {}
+    errors: Dict[str, str] = {}
+    if parallel and len(names) > 1:
+        # Threads share the loaded frame and its cache; numpy, sklearn and
+        # torch release the GIL for the heavy parts.
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = {name: executor.submit(run, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    outcomes[name] = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    errors[name] = str(exc)
+    else:
+        for name in names:
+            try:
+                outcomes[name] = run(name)
+            except Exception as exc:  # noqa: BLE001
+                errors[name] = str(exc)
+
+    return {
+        "source": frame.source,
+        "detectors": {name: outcome["payload"] for name, outcome in outcomes.items()},
+        "errors": errors,
+        "timings": {name: round(outcome["seconds"], 4) for name, outcome in outcomes.items()},
+    }
+
+
+def analyze(
+    path: str,
+    detectors: Optional[Iterable[str]] = None,
+    parallel: bool = False,
+    options: Optional[Dict[str, Dict[str, object]]] = None,
+) -> Dict[str, object]:
+    started = time.perf_counter()
+    frame = load_flight(path)
+    ingest_seconds = time.perf_counter() - started
+
+    payload = run_detectors(frame, detectors=detectors, parallel=parallel, options=options)
+    payload["ingest"] = {
+        "n_rows": frame.n_rows,
+        "n_columns": int(frame.data.shape[1]),
+        "seconds": round(ingest_seconds, 4),
+    }
+    return payload
+
+
+def analyze_to_json(
+    path: str,
+    detectors: Optional[Iterable[str]] = None,
+    parallel: bool = False,
+    options: Optional[Dict[str, Dict[str, object]]] = None,
+) -> str:
+    payload = analyze(path, detectors=detectors, parallel=parallel, options=options)
+    return json.dumps(payload, indent=2)
@@ -0,0 +1,461 @@
+"""Sweep detector configurations over the labeled DASHlink corpus.
+
+    python -m services.fdr_anomaly.evaluate --data-dir flights/ [--grid grid.json] \\
+        [--per-label 25] [--workers 4] [--output results.json]
+
+Flights are matched to ``DASHlink_full_fourclass_raw_meta.csv`` by file stem
+(``flight_record`` or ``data_instance``); a flight is anomalous when its
+``label`` is not 0. Each configuration runs in its own spawned process, so
+its peak RSS is not inflated by another configuration's allocations. The
+model registry, run cache and similarity index are disabled in the workers:
+a registry hit would skip training and hide the cost of ``epochs``.
+
+Each flight gets one score: the peak of its score timeline divided by the
+timeline's ``--reference-percentile`` (the median by default). Flights at or above
+``--decision-ratio`` count as flagged for precision/recall; average
+precision ranks flights by the score and needs no cut. The table marks
+configurations on the Pareto front of quality, seconds per flight and peak
+memory.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from services.fdr_anomaly.scheduler import DEFAULT_THREADS_PER_JOB, THREAD_ENV_VARS
+
+DEFAULT_LABELS = PROJECT_ROOT / "docs" / "Data_Samples" / "DASHlink_full_fourclass_raw_meta.csv"
+FLIGHT_SUFFIXES = (".csv", ".xlsx", ".xls")
+ID_COLUMNS = ("flight_record", "data_instance")
+DETECTORS = {"autoencoder", "mad_iforest"}
+QUALITY_METRICS = {"f1", "recall", "precision", "average_precision"}
+# Peak over median: a high percentile would sit inside any anomaly longer
+# than the remaining tail once windows smear it across neighbouring rows.
+DEFAULT_DECISION_RATIO = 3.0
+DEFAULT_REFERENCE_PERCENTILE = 50.0
+# Workers must not share state across configurations.
+ISOLATED_ENV_VARS = (
+    "FDR_MODEL_REGISTRY_DIR",
+    "FDR_REUSE_MODELS",
+    "FDR_RUN_CACHE_DIR",
+    "FDR_SIMILARITY_INDEX_DIR",
+)
+
+# Keys a configuration may set, with the value used when it does not.
+CONFIG_DEFAULTS: Dict[str, object] = {
+    "detector": "autoencoder",
+    "window_size": None,
+    "stride": None,
+    "epochs": None,
+    "compiled_runtime": None,
+    "window_encoding": None,
+    "multires": False,
+    "resample_hz": 0.0,
+}
+AUTOENCODER_ONLY = (
+    "window_size",
+    "stride",
+    "epochs",
+    "compiled_runtime",
+    "window_encoding",
+    "multires",
+)
+
+# "numpy" and "onnx" score with the float32 dense stack; "none" keeps the
+# training backend's own precision.
+DEFAULT_GRID: List[Dict[str, object]] = [
+    {
+        "detector": "autoencoder",
+        "window_size": [30, 60],
+        "stride": [5, 10],
+        "epochs": [10, 30],
+        "compiled_runtime": ["none", "numpy"],
+    },
+    {"detector": "autoencoder", "multires": True},
+    {"detector": "autoencoder", "resample_hz": [0.5, 1.0]},
+    {"detector": "mad_iforest", "resample_hz": [0.0, 1.0]},
+]
+
+
+def expand_grid(grid: Sequence[Dict[str, object]]) -> List[Dict[str, object]]:
+    """Cartesian product of each grid entry's list values, deduplicated in order."""
+
+    configs: List[Dict[str, object]] = []
+    seen = set()
+    for entry in grid:
+        unknown = sorted(set(entry) - set(CONFIG_DEFAULTS))
+        if unknown:
+            raise ValueError(f"Unknown configuration key(s): {', '.join(unknown)}.")
+        axes = {key: value if isinstance(value, list) else [value] for key, value in entry.items()}
+        for values in itertools.product(*axes.values()):
+            config = dict(CONFIG_DEFAULTS, **dict(zip(axes, values)))
+            if config["detector"] not in DETECTORS:
+                raise ValueError(
+                    f"Unknown detector {config['detector']!r}; expected one of {sorted(DETECTORS)}."
+                )
+            if config["detector"] != "autoencoder":
+                config.update({key: CONFIG_DEFAULTS[key] for key in AUTOENCODER_ONLY})
+            key = json.dumps(config, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                configs.append(config)
+    return configs
+
+
+def config_name(config: Dict[str, object]) -> str:
+    parts = [str(config["detector"])]
+    if config["detector"] == "autoencoder":
+        from services.fdr_anomaly.autoencoder import (
+            DEFAULT_EPOCHS,
+            DEFAULT_STRIDE,
+            DEFAULT_WINDOW_ENCODING,
+            DEFAULT_WINDOW_SIZE,
+        )
+        from services.fdr_anomaly.model_registry import DEFAULT_COMPILED_RUNTIME
+
+        window = config["window_size"] or DEFAULT_WINDOW_SIZE
+        stride = config["stride"] or DEFAULT_STRIDE
+        parts.append(f"w{window}/s{stride}")
+        parts.append(f"e{config['epochs'] or DEFAULT_EPOCHS}")
+        parts.append(str(config["compiled_runtime"] or DEFAULT_COMPILED_RUNTIME))
+        encoding = config["window_encoding"] or DEFAULT_WINDOW_ENCODING
+        if encoding != "raw":
+            parts.append(str(encoding))
+        if config["multires"]:
+            parts.append("multires")
+    if config["resample_hz"]:
+        parts.append(f"{config['resample_hz']:g}Hz")
+    return " ".join(parts)
+
+
+def load_corpus(
+    labels_path: Path,
+    data_dir: Path,
+    per_label: Optional[int] = None,
+    limit: Optional[int] = None,
+    seed: int = 0,
+) -> List[Tuple[str, int]]:
+    """``(path, label)`` for every labeled flight that has a file under ``data_dir``."""
+
+    labels = pd.read_csv(labels_path, usecols=[*ID_COLUMNS, "label"])
+    files: Dict[str, str] = {}
+    for path in sorted(data_dir.rglob("*")):
+        if path.suffix.lower() in FLIGHT_SUFFIXES:
+            files.setdefault(path.stem, str(path))
+
+    paths = labels[ID_COLUMNS[0]].astype(str).map(files)
+    for column in ID_COLUMNS[1:]:
+        paths = paths.combine_first(labels[column].astype(str).map(files))
+    corpus = labels.assign(path=paths).dropna(subset=["path"])
+    if per_label is not None:
+        corpus = corpus.sample(frac=1, random_state=seed).groupby("label").head(per_label)
+    if limit is not None:
+        corpus = corpus.sample(min(limit, len(corpus)), random_state=seed)
+    corpus = corpus.sort_index()
+    return list(zip(corpus["path"], corpus["label"].astype(int)))
+
+
+def flight_score(scores: np.ndarray, reference_percentile: float) -> float:
+    """Peak of a score timeline relative to its ``reference_percentile``."""
+
+    scores = np.asarray(scores, dtype=float)
+    scores = scores[np.isfinite(scores)]
+    if scores.size == 0:
+        return 0.0
+    reference = float(np.percentile(scores, reference_percentile))
+    peak = float(scores.max())
+    if reference <= 0:
+        return peak - reference
+    return peak / reference
+
+
+@contextmanager
+def _worker_environment(threads_per_job: int) -> Iterator[None]:
+    """Cap threads and drop shared-state directories until the block exits.
+
+    Spawned workers inherit the environment at start-up, before they import
+    numpy or any detector module; the caller's own environment is restored.
+    """
+
+    saved = {name: os.environ.get(name) for name in (*THREAD_ENV_VARS, *ISOLATED_ENV_VARS)}
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(max(1, threads_per_job))
+    for name in ISOLATED_ENV_VARS:
+        os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _run_config(
+    config: Dict[str, object], flights: Sequence[Tuple[str, int]], reference_percentile: float
+) -> Dict[str, object]:
+    from services.fdr_anomaly import autoencoder, detect
+    from services.fdr_anomaly.flight import load_flight
+
+    options = {
+        key: value for key, value in config.items() if key != "detector" and value is not None
+    }
+    scores: List[Optional[float]] = []
+    seconds: List[float] = []
+    errors: List[Dict[str, str]] = []
+    for path, _ in flights:
+        try:
+            frame = load_flight(path)
+            started = time.perf_counter()
+            if config["detector"] == "autoencoder":
+                payload = autoencoder.detect_frame(frame, warm_start=False, **options)
+                timeline = payload["timeline"]["score"]
+            else:
+                payload = detect.detect_frame(frame, resample_hz=options["resample_hz"])
+                timeline = payload["timeline"]["combined_score"]
+            seconds.append(time.perf_counter() - started)
+            scores.append(flight_score(timeline, reference_percentile))
+        except Exception as exc:  # noqa: BLE001
+            scores.append(None)
+            errors.append({"path": path, "error": str(exc)})
+    # ru_maxrss is in KiB on Linux.
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "scores": scores,
+        "seconds": seconds,
+        "peak_rss_mb": round(peak_kib / 1024, 1),
+        "errors": errors,
+    }
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def score_config(
+    scores: Sequence[Optional[float]], labels: Sequence[int], decision_ratio: float
+) -> Dict[str, object]:
+    from sklearn.metrics import average_precision_score
+
+    scored = [(score, label) for score, label in zip(scores, labels) if score is not None]
+    if not scored:
+        return {"flights": 0}
+    values = np.array([score for score, _ in scored])
+    label_values = np.array([label for _, label in scored])
+    truth = label_values != 0
+    flagged = values >= decision_ratio
+    tp = int((flagged & truth).sum())
+    fp = int((flagged & ~truth).sum())
+    fn = int((~flagged & truth).sum())
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, tp + fn)
+    f1 = (
+        round(2 * precision * recall / (precision + recall), 4)
+        if precision and recall
+        else 0.0
+    )
+    return {
+        "flights": len(scored),
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "tn": int((~flagged & ~truth).sum()),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "average_precision": round(float(average_precision_score(truth, values)), 4)
+        if truth.any() and not truth.all()
+        else None,
+        "recall_by_label": {
+            str(label): _ratio(
+                int((flagged & (label_values == label)).sum()), int((label_values == label).sum())
+            )
+            for label in sorted(set(label_values.tolist()) - {0})
+        },
+    }
+
+
+def pareto_front(rows: Sequence[Dict[str, object]], quality: str) -> List[int]:
+    """Indices of rows no other row beats on quality, seconds per flight and peak memory."""
+
+    points = [
+        (idx, row["metrics"].get(quality), row["seconds_per_flight"], row["peak_rss_mb"])
+        for idx, row in enumerate(rows)
+        if row["metrics"].get(quality) is not None and row["seconds_per_flight"] is not None
+    ]
+    front = []
+    for idx, value, seconds, memory in points:
+        dominated = any(
+            other_value >= value
+            and other_seconds <= seconds
+            and other_memory <= memory
+            and (other_value, other_seconds, other_memory) != (value, seconds, memory)
+            for _, other_value, other_seconds, other_memory in points
+        )
+        if not dominated:
+            front.append(idx)
+    return front
+
+
+def evaluate(
+    configs: Sequence[Dict[str, object]],
+    flights: Sequence[Tuple[str, int]],
+    workers: int = 1,
+    decision_ratio: float = DEFAULT_DECISION_RATIO,
+    reference_percentile: float = DEFAULT_REFERENCE_PERCENTILE,
+    quality: str = "f1",
+    threads_per_job: int = DEFAULT_THREADS_PER_JOB,
+) -> Dict[str, object]:
+    if quality not in QUALITY_METRICS:
+        raise ValueError(
+            f"Unknown quality metric {quality!r}; expected one of {sorted(QUALITY_METRICS)}."
+        )
+    if not flights:
+        raise ValueError("No labeled flights found.")
+
+    labels = [label for _, label in flights]
+    rows: List[Optional[Dict[str, object]]] = [None] * len(configs)
+    # max_tasks_per_child=1 spawns workers for the pool's whole lifetime, so
+    # the worker environment must outlast it.
+    with _worker_environment(threads_per_job), ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(configs))),
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        futures = {
+            executor.submit(_run_config, config, flights, reference_percentile): idx
+            for idx, config in enumerate(configs)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            run = future.result()
+            seconds = run["seconds"]
+            rows[idx] = {
+                "name": config_name(configs[idx]),
+                "config": configs[idx],
+                "metrics": score_config(run["scores"], labels, decision_ratio),
+                "seconds_total": round(sum(seconds), 3),
+                "seconds_per_flight": round(sum(seconds) / len(seconds), 4) if seconds else None,
+                "peak_rss_mb": run["peak_rss_mb"],
+                "errors": run["errors"],
+            }
+
+    for idx in pareto_front(rows, quality):
+        rows[idx]["pareto"] = True
+    return {
+        "flights": len(flights),
+        "anomalous": sum(label != 0 for label in labels),
+        "decision_ratio": decision_ratio,
+        "reference_percentile": reference_percentile,
+        "quality": quality,
+        "results": rows,
+    }
+
+
+def _format(value: object) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def pareto_table(report: Dict[str, object]) -> str:
+    quality = report["quality"]
+    columns = (
+        "pareto", "config", quality, "precision", "recall", "AP", "s/flight", "peak MB", "errors"
+    )
+    rows = sorted(
+        report["results"],
+        key=lambda row: (not row.get("pareto", False), row["seconds_per_flight"] or float("inf")),
+    )
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in rows:
+        metrics = row["metrics"]
+        cells = (
+            "*" if row.get("pareto") else "",
+            row["name"],
+            metrics.get(quality),
+            metrics.get("precision"),
+            metrics.get("recall"),
+            metrics.get("average_precision"),
+            row["seconds_per_flight"],
+            row["peak_rss_mb"],
+            len(row["errors"]),
+        )
+        lines.append("| " + " | ".join(_format(cell) for cell in cells) + " |")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", required=True, type=Path, help="Directory of flight files.")
+    parser.add_argument("--labels", type=Path, default=DEFAULT_LABELS, help="Label metadata CSV.")
+    parser.add_argument(
+        "--grid",
+        type=Path,
+        help="JSON object or list of objects; list values are swept as a product.",
+    )
+    parser.add_argument("--per-label", type=int, help="Sample at most N flights per label.")
+    parser.add_argument("--limit", type=int, help="Sample at most N flights overall.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // DEFAULT_THREADS_PER_JOB),
+        help="Configurations evaluated at once.",
+    )
+    parser.add_argument("--threads-per-job", type=int, default=DEFAULT_THREADS_PER_JOB)
+    parser.add_argument("--decision-ratio", type=float, default=DEFAULT_DECISION_RATIO)
+    parser.add_argument("--reference-percentile", type=float, default=DEFAULT_REFERENCE_PERCENTILE)
+    parser.add_argument("--quality", default="f1", choices=sorted(QUALITY_METRICS))
+    parser.add_argument("--output", type=Path, help="Also write the full report as JSON.")
+    args = parser.parse_args()
+
+    try:
+        grid = DEFAULT_GRID
+        if args.grid is not None:
+            grid = json.loads(args.grid.read_text())
+            grid = grid if isinstance(grid, list) else [grid]
+        configs = expand_grid(grid)
+        flights = load_corpus(args.labels, args.data_dir, args.per_label, args.limit, args.seed)
+        report = evaluate(
+            configs,
+            flights,
+            workers=args.workers,
+            decision_ratio=args.decision_ratio,
+            reference_percentile=args.reference_percentile,
+            quality=args.quality,
+            threads_per_job=args.threads_per_job,
+        )
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(
+        f"{report['flights']} flights ({report['anomalous']} anomalous), "
+        f"{len(configs)} configurations"
+    )
+    print(pareto_table(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
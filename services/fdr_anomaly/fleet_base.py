@@ -0,0 +1,159 @@
+"""Train a fleet base autoencoder that per-flight models warm-start from.
+
+    FDR_MODEL_REGISTRY_DIR=/shared/models \\
+        python -m services.fdr_anomaly.fleet_base flight1.csv flight2.csv ... [--epochs 30]
+
+Every flight is standardized and windowed exactly as ``detect_anomalies``
+would, and only its first 70% of windows is used. Flights whose parameter
+schema differs from the first flight's, or that are shorter than one window,
+are skipped. The trained model is
+stored in the registry under ``base_model_key``; ``FDR_WARM_START=1`` then
+fine-tunes it per flight.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from services.fdr_anomaly.autoencoder import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_EPOCHS,
+    DEFAULT_STRIDE,
+    DEFAULT_WINDOW_ENCODING,
+    DEFAULT_WINDOW_SIZE,
+    _apply_scaling,
+    _get_backend,
+    _input_scaling,
+    _prepare_numeric_frame,
+    _standardize,
+    _window_inputs,
+)
+from services.fdr_anomaly.flight import load_flight
+from services.fdr_anomaly.model_registry import MODEL_REGISTRY, base_model_key, model_key
+
+DEFAULT_MAX_WINDOWS = 200_000
+
+
+def _training_windows(
+    path: str, window_size: int, stride: int, encoding: str
+) -> Tuple[List[str], np.ndarray]:
+    numeric_df, feature_names = _prepare_numeric_frame(load_flight(path).data)
+    train_end = max(1, int(numeric_df.shape[0] * 0.7))
+    standardized, _, _ = _standardize(numeric_df, train_end)
+    windows, starts = _window_inputs(
+        standardized.to_numpy(dtype=float), window_size, stride, None, encoding
+    )
+    train_window_end = max(1, int(len(starts) * 0.7))
+    windows = windows[:train_window_end]
+    _apply_scaling(windows, _input_scaling(windows, encoding))
+    return feature_names, windows.reshape(windows.shape[0], -1)
+
+
+def train_base_model(
+    paths: Sequence[str],
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    stride: int = DEFAULT_STRIDE,
+    epochs: int = DEFAULT_EPOCHS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    encoding: str = DEFAULT_WINDOW_ENCODING,
+    max_windows: int = DEFAULT_MAX_WINDOWS,
+    seed: int = 0,
+) -> Dict[str, object]:
+    if MODEL_REGISTRY is None:
+        raise ValueError("Storing a base model needs FDR_MODEL_REGISTRY_DIR to be set.")
+
+    # Each flight contributes at most an equal share of ``max_windows``, so
+    # memory stays bounded by the share rather than the fleet size.
+    per_flight = max(1, -(-max_windows // max(1, len(paths))))
+    rng = np.random.default_rng(seed)
+    schema: List[str] = []
+    chunks = []
+    used, skipped = [], []
+    for path in paths:
+        feature_names, windows = _training_windows(path, window_size, stride, encoding)
+        if not schema:
+            schema = feature_names
+        if feature_names != schema or windows.shape[0] == 0:
+            skipped.append(path)
+            continue
+        if windows.shape[0] > per_flight:
+            windows = windows[np.sort(rng.choice(windows.shape[0], per_flight, replace=False))]
+        chunks.append(windows)
+        used.append(path)
+    if not chunks:
+        raise ValueError("No flights with usable windows.")
+    data = np.concatenate(chunks)
+
+    backend = _get_backend(data.shape[1])
+    if not backend.supports_warm_start:
+        raise ValueError(
+            "Base models need torch or tensorflow; the PCA fallback cannot warm-start."
+        )
+    started = time.perf_counter()
+    backend.fit(data, epochs=epochs, batch_size=batch_size)
+    train_seconds = time.perf_counter() - started
+
+    key = base_model_key(model_key(schema, window_size, encoding))
+    MODEL_REGISTRY.put(
+        key,
+        backend.dense_layers(),
+        {
+            "backend": backend.__class__.__name__,
+            "window_size": int(window_size),
+            "input_dim": int(data.shape[1]),
+            "flights": len(used),
+            "windows": int(data.shape[0]),
+            "epochs": int(epochs),
+        },
+    )
+    return {
+        "key": key,
+        "flights": used,
+        "skipped": skipped,
+        "windows": int(data.shape[0]),
+        "train_seconds": round(train_seconds, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train a fleet base autoencoder.")
+    parser.add_argument("paths", nargs="+", help="Flight files sharing one parameter schema.")
+    parser.add_argument("--window-size", type=int, default=DEFAULT_WINDOW_SIZE)
+    parser.add_argument("--stride", type=int, default=DEFAULT_STRIDE)
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--encoding", default=DEFAULT_WINDOW_ENCODING)
+    parser.add_argument(
+        "--max-windows",
+        type=int,
+        default=DEFAULT_MAX_WINDOWS,
+        help="Upper bound on pooled training windows, split evenly across flights.",
+    )
+    args = parser.parse_args()
+    try:
+        result = train_base_model(
+            args.paths,
+            window_size=args.window_size,
+            stride=args.stride,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            encoding=args.encoding,
+            max_windows=args.max_windows,
+        )
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
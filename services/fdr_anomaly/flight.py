@@ -0,0 +1,98 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from services.fdr_anomaly.session_time import SESSION_TIME_PARSER
+
+
+TIME_COLUMN = "Session Time"
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightFrame:
+    """A flight loaded and time-ordered once, shared by every detector.
+
+    ``cached`` memoizes derived products (numeric selections, scaled
+    matrices, ...) so detectors running on the same frame reuse them.
+    ``row_order`` is the file row behind each row when loading had to sort
+    them (``None`` when the file was already in time order). Resampled
+    frames carry ``source_rows``, the (first, last) file row behind each
+    row, the row count they were aggregated from and their grid rate
+    ``sample_hz``.
+    """
+
+    source: str
+    data: pd.DataFrame
+    timestamps: np.ndarray
+    row_order: Optional[np.ndarray] = None
+    source_rows: Optional[np.ndarray] = None
+    source_row_count: Optional[int] = None
+    sample_hz: Optional[float] = None
+    _cache: Dict[str, object] = field(default_factory=dict, repr=False)
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.data.shape[0])
+
+    def cached(self, key: str, factory: Callable[[], T]) -> T:
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+
+def load_data(path: str) -> pd.DataFrame:
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def header_signature(columns: Iterable[object]) -> str:
+    """Stable key for a recorder layout, derived from its ordered headers."""
+
+    joined = "\x1f".join(str(column) for column in columns)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def parse_session_time(series: pd.Series, source_key: Optional[str] = None) -> np.ndarray:
+    return SESSION_TIME_PARSER.parse(series, source_key).seconds
+
+
+def frame_from_dataframe(df: pd.DataFrame, source: str = "<memory>") -> FlightFrame:
+    if TIME_COLUMN not in df.columns:
+        raise ValueError("Input file must include a 'Session Time' column.")
+
+    parsed = SESSION_TIME_PARSER.parse(df[TIME_COLUMN], header_signature(df.columns))
+    if parsed.is_sorted:
+        # Already in time order: skip the argsort and the reordering copy.
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+        return FlightFrame(source=source, data=df, timestamps=parsed.seconds)
+
+    order = np.argsort(parsed.seconds)
+    data = df.iloc[order].reset_index(drop=True)
+    return FlightFrame(
+        source=source, data=data, timestamps=parsed.seconds[order], row_order=order
+    )
+
+
+def load_flight(path: str) -> FlightFrame:
+    return frame_from_dataframe(load_data(path), source=path)
+
+
+def group_runs(timestamps: np.ndarray, indices: np.ndarray, gap_seconds: float) -> List[np.ndarray]:
+    """Split flagged row indices into contiguous runs separated by time gaps."""
+
+    if indices.size == 0:
+        return []
+
+    breaks = np.where(~(np.diff(timestamps[indices]) <= gap_seconds))[0] + 1
+    bounds = np.concatenate(([0], breaks, [indices.size]))
+    return [
+        np.arange(indices[bounds[idx]], indices[bounds[idx + 1] - 1] + 1)
+        for idx in range(bounds.size - 1)
+    ]
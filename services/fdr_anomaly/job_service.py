@@ -0,0 +1,97 @@
+"""FastAPI front end for the FDR analysis job scheduler.
+
+Run from the repository root:
+
+    uvicorn services.fdr_anomaly.job_service:app --host 127.0.0.1 --port 8100
+"""
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+from services.fdr_anomaly.scheduler import SUCCEEDED, TERMINAL_STATUSES, JobScheduler
+
+app = FastAPI(title="FDR Analysis Job Scheduler", version="1.0.0")
+
+SCHEDULER: Optional[JobScheduler] = None
+
+
+class JobRequest(BaseModel):
+    path: str = Field(..., description="Local path of the CSV/Excel flight file")
+    priority: int = Field(0, description="Higher values run first")
+    timeout: Optional[float] = Field(None, description="Seconds before the job is terminated")
+    detectors: Optional[List[str]] = Field(
+        None, description="Engine detectors to run; defaults to the autoencoder payload"
+    )
+    options: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _scheduler() -> JobScheduler:
+    if SCHEDULER is None:
+        raise HTTPException(status_code=503, detail="Scheduler is not running")
+    return SCHEDULER
+
+
+def _job_or_404(job_id: str):
+    job = _scheduler().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.on_event("startup")
+def _start_scheduler() -> None:
+    global SCHEDULER
+    SCHEDULER = JobScheduler()
+
+
+@app.on_event("shutdown")
+def _stop_scheduler() -> None:
+    if SCHEDULER is not None:
+        SCHEDULER.shutdown()
+
+
+@app.get("/health")
+def health() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest) -> Dict[str, Any]:
+    job = _scheduler().submit(
+        request.path,
+        priority=request.priority,
+        timeout=request.timeout,
+        detectors=request.detectors,
+        options=request.options,
+    )
+    return job.describe()
+
+
+@app.get("/jobs/stats")
+def job_stats() -> Dict[str, Any]:
+    return _scheduler().stats()
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str) -> Dict[str, Any]:
+    return _job_or_404(job_id).describe()
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str) -> Dict[str, Any]:
+    job = _job_or_404(job_id)
+    if job.status not in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=400, detail=job.error or f"Job {job.status}")
+    result = _scheduler().take_result(job_id)
+    if result is None:
+        raise HTTPException(status_code=410, detail=f"Result was {job.result_released}")
+    return result
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    _job_or_404(job_id)
+    return _scheduler().cancel(job_id).describe()
@@ -0,0 +1,177 @@
+import importlib.util
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.fdr_anomaly.flight import header_signature
+
+
+# Bump when the stored layout changes so stale entries are ignored.
+REGISTRY_VERSION = 1
+MODEL_REGISTRY_DIR = os.getenv("FDR_MODEL_REGISTRY_DIR", "")
+# Scoring a flight with a model trained on another flight of the same schema
+# skips training but changes what "normal" means, so it needs its own opt-in.
+REUSE_SCHEMA_MODELS = os.getenv("FDR_REUSE_MODELS", "0").lower() in {"1", "true", "yes"}
+COMPILED_RUNTIMES = {"none", "numpy", "onnx", "torchscript", "auto"}
+DEFAULT_COMPILED_RUNTIME = os.getenv("FDR_COMPILED_RUNTIME", "none")
+
+# (weights of shape (in, out), bias of shape (out,)) per dense layer; every
+# layer but the last is followed by a ReLU.
+DenseLayers = List[Tuple[np.ndarray, np.ndarray]]
+
+
+def model_key(feature_names: Sequence[str], window_size: int, encoding: str = "raw") -> str:
+    key = f"v{REGISTRY_VERSION}-{header_signature(feature_names)}-w{int(window_size)}"
+    return key if encoding == "raw" else f"{key}-{encoding}"
+
+
+def base_model_key(key: str) -> str:
+    """Registry key of the fleet base model that warm-starts models under ``key``."""
+
+    return f"base-{key}"
+
+
+def onnx_available() -> bool:
+    return (
+        importlib.util.find_spec("onnx") is not None
+        and importlib.util.find_spec("onnxruntime") is not None
+    )
+
+
+def build_onnx(layers: DenseLayers) -> bytes:
+    """Serialize the dense stack as an ONNX graph of Gemm/Relu nodes."""
+
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    nodes = []
+    initializers = []
+    current = "windows"
+    for idx, (weights, bias) in enumerate(layers):
+        initializers.append(numpy_helper.from_array(weights.astype(np.float32), f"W{idx}"))
+        initializers.append(numpy_helper.from_array(bias.astype(np.float32), f"b{idx}"))
+        output = "reconstruction" if idx == len(layers) - 1 else f"dense{idx}"
+        nodes.append(helper.make_node("Gemm", [current, f"W{idx}", f"b{idx}"], [output]))
+        if idx < len(layers) - 1:
+            nodes.append(helper.make_node("Relu", [output], [f"relu{idx}"]))
+            output = f"relu{idx}"
+        current = output
+
+    input_dim = layers[0][0].shape[0]
+    output_dim = layers[-1][0].shape[1]
+    graph = helper.make_graph(
+        nodes,
+        "fdr_autoencoder",
+        [helper.make_tensor_value_info("windows", TensorProto.FLOAT, ["batch", input_dim])],
+        [helper.make_tensor_value_info("reconstruction", TensorProto.FLOAT, ["batch", output_dim])],
+        initializers,
+    )
+    # Pin the IR version so older onnxruntime builds can load the graph.
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    onnx.checker.check_model(model)
+    return model.SerializeToString()
+
+
+def export_onnx(layers: DenseLayers, path: Path) -> Path:
+    path = Path(path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(build_onnx(layers))
+    os.replace(tmp_path, path)
+    return path
+
+
+@dataclass
+class RegistryEntry:
+    key: str
+    layers: DenseLayers
+    metadata: Dict[str, object]
+    onnx_path: Optional[Path] = None
+    torchscript_path: Optional[Path] = None
+
+
+class ModelRegistry:
+    """Trained autoencoder weights keyed by feature schema and window size.
+
+    Each entry is a ``.npz`` of dense layers plus a JSON metadata file, with
+    optional ``.onnx`` and TorchScript ``.pt`` exports next to it. Any node
+    can score with an entry through the NumPy runtime, with or without
+    torch or tensorflow installed.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._memory: Dict[str, RegistryEntry] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str) -> Optional[RegistryEntry]:
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        try:
+            metadata = json.loads(self._path(key, ".json").read_text())
+            with np.load(self._path(key, ".npz")) as archive:
+                layers = [
+                    (archive[f"W{idx}"], archive[f"b{idx}"])
+                    for idx in range(int(metadata["n_layers"]))
+                ]
+        except (OSError, ValueError, KeyError):
+            return None
+        onnx_path = self._path(key, ".onnx")
+        torchscript_path = self._path(key, ".pt")
+        entry = RegistryEntry(
+            key=key,
+            layers=layers,
+            metadata=metadata,
+            onnx_path=onnx_path if onnx_path.exists() else None,
+            torchscript_path=torchscript_path if torchscript_path.exists() else None,
+        )
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def put(self, key: str, layers: DenseLayers, metadata: Dict[str, object]) -> RegistryEntry:
+        metadata = dict(metadata, n_layers=len(layers), registry_version=REGISTRY_VERSION)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for idx, (weights, bias) in enumerate(layers):
+            arrays[f"W{idx}"] = weights.astype(np.float32)
+            arrays[f"b{idx}"] = bias.astype(np.float32)
+        npz_path = self._path(key, ".npz")
+        tmp_path = npz_path.with_name(f"{key}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, npz_path)
+        json_path = self._path(key, ".json")
+        tmp_path = json_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(metadata))
+        os.replace(tmp_path, json_path)
+
+        onnx_path = None
+        if onnx_available():
+            onnx_path = export_onnx(layers, self._path(key, ".onnx"))
+        torchscript_path = self._path(key, ".pt")
+        entry = RegistryEntry(
+            key=key,
+            layers=[(arrays[f"W{idx}"], arrays[f"b{idx}"]) for idx in range(len(layers))],
+            metadata=metadata,
+            onnx_path=onnx_path,
+            torchscript_path=torchscript_path if torchscript_path.exists() else None,
+        )
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def torchscript_path(self, key: str) -> Path:
+        return self._path(key, ".pt")
+
+
+MODEL_REGISTRY: Optional[ModelRegistry] = (
+    ModelRegistry(MODEL_REGISTRY_DIR) if MODEL_REGISTRY_DIR else None
+)
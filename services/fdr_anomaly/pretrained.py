@@ -0,0 +1,108 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from python_model.utils import build_feature_dataframe
+from services.fdr_anomaly.flight import FlightFrame, group_runs
+
+
+ARTIFACT_DIR = Path(
+    os.getenv("FDR_PRETRAINED_DIR", Path(__file__).resolve().parents[2] / "python_model")
+)
+SEGMENT_GAP_SECONDS = 2.0
+TOP_DRIVER_COUNT = 3
+
+
+@dataclass
+class TimelineData:
+    timestamps: List[float]
+    score: List[float]
+    is_anomaly: List[bool]
+
+
+@dataclass
+class PretrainedArtifacts:
+    model: object
+    scaler: object
+    features: List[str]
+
+
+_ARTIFACTS: Optional[PretrainedArtifacts] = None
+
+
+def load_artifacts(directory: Path = ARTIFACT_DIR) -> PretrainedArtifacts:
+    global _ARTIFACTS
+    if _ARTIFACTS is None:
+        try:
+            _ARTIFACTS = PretrainedArtifacts(
+                model=joblib.load(directory / "model.joblib"),
+                scaler=joblib.load(directory / "scaler.joblib"),
+                features=list(joblib.load(directory / "features.joblib")),
+            )
+        except FileNotFoundError as exc:
+            raise ValueError(
+                "Model artifacts are missing. Train the model with train_model.py first."
+            ) from exc
+    return _ARTIFACTS
+
+
+def _scaled_features(frame: FlightFrame, artifacts: PretrainedArtifacts) -> pd.DataFrame:
+    feature_df = build_feature_dataframe(frame.data)[artifacts.features]
+    scaled = artifacts.scaler.transform(feature_df)
+    return pd.DataFrame(scaled, columns=artifacts.features)
+
+
+def detect_frame(frame: FlightFrame) -> Dict[str, object]:
+    artifacts = load_artifacts()
+    scaled = frame.cached("pretrained.scaled", lambda: _scaled_features(frame, artifacts))
+
+    prediction = artifacts.model.predict(scaled.to_numpy())
+    score = -artifacts.model.decision_function(scaled.to_numpy())
+    anomaly_mask = prediction == -1
+    timestamps = frame.timestamps
+
+    segments = []
+    for segment_indices in group_runs(timestamps, np.where(anomaly_mask)[0], SEGMENT_GAP_SECONDS):
+        seg_times = timestamps[segment_indices]
+        driver_scores = scaled.iloc[segment_indices].abs().max(axis=0).sort_values(ascending=False)
+        top_drivers = [
+            {"parameter": name, "max_scaled_value": float(value)}
+            for name, value in driver_scores.head(TOP_DRIVER_COUNT).items()
+        ]
+        segments.append(
+            {
+                "start_time": float(seg_times[0]),
+                "end_time": float(seg_times[-1]),
+                "duration": float(seg_times[-1] - seg_times[0]),
+                "points": int(segment_indices.size),
+                "peak_score": float(score[segment_indices].max()),
+                "top_drivers": top_drivers,
+                "explanation": "Top drivers: "
+                + ", ".join(driver["parameter"] for driver in top_drivers)
+                + ".",
+            }
+        )
+
+    n_rows = frame.n_rows
+    timeline = TimelineData(
+        timestamps=timestamps.tolist(),
+        score=np.round(score, 4).tolist(),
+        is_anomaly=anomaly_mask.tolist(),
+    )
+    summary = {
+        "total_points": int(n_rows),
+        "n_params_used": int(len(artifacts.features)),
+        "total_anomalies": int(anomaly_mask.sum()),
+        "total_segments": int(len(segments)),
+        "anomaly_percentage": (float(anomaly_mask.sum()) / n_rows) * 100 if n_rows else None,
+    }
+    return {
+        "summary": summary,
+        "segments": segments,
+        "timeline": timeline.__dict__,
+    }
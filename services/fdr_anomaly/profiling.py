@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.fdr_anomaly.flight import header_signature
+
+
+# Bump when the selection rules change so stale cached schemas are ignored.
+PROFILE_VERSION = 2
+MAX_MISSING_RATIO = 0.4
+MIN_CARDINALITY = 10
+CARDINALITY_SAMPLE_ROWS = 2048
+# Empty keeps cached schemas in memory only.
+SCHEMA_CACHE_DIR = os.getenv("FDR_SCHEMA_CACHE_DIR", "")
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    missing_ratio: float
+    cardinality: int
+    is_binary: bool
+    is_text: bool
+    selected: bool
+
+
+def _coerce_numeric(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    matrix = np.empty((df.shape[0], len(columns)), dtype=float)
+    for idx, column in enumerate(columns):
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            matrix[:, idx] = series.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            matrix[:, idx] = pd.to_numeric(series, errors="coerce").to_numpy(
+                dtype=float, na_value=np.nan
+            )
+    return matrix
+
+
+def _distinct_counts(matrix: np.ndarray) -> np.ndarray:
+    # NaNs sort last, so each column is a run of sorted values then NaNs.
+    ordered = np.sort(matrix, axis=0)
+    valid = ~np.isnan(ordered)
+    if ordered.shape[0] == 0:
+        return np.zeros(ordered.shape[1], dtype=int)
+    changes = ((ordered[1:] != ordered[:-1]) & valid[1:]).sum(axis=0)
+    return np.where(valid[0], 1 + changes, 0)
+
+
+def _capped_cardinality(matrix: np.ndarray, cap: int) -> np.ndarray:
+    """Distinct non-NaN values per column, capped at ``cap``.
+
+    A head sample settles most continuous channels; only columns that have
+    not reached the cap there are sorted in full.
+    """
+
+    sample = matrix[:CARDINALITY_SAMPLE_ROWS]
+    cardinality = np.minimum(_distinct_counts(sample), cap)
+    pending = np.where(cardinality < cap)[0]
+    if pending.size and matrix.shape[0] > sample.shape[0]:
+        cardinality[pending] = np.minimum(_distinct_counts(matrix[:, pending]), cap)
+    return cardinality
+
+
+def _column_checks(
+    matrix: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Missing ratio, capped cardinality, binary flag and selection per column."""
+
+    missing = np.isnan(matrix)
+    missing_ratio = missing.mean(axis=0) if matrix.shape[0] else np.ones(matrix.shape[1])
+    cardinality = _capped_cardinality(matrix, MIN_CARDINALITY)
+    is_binary = ((matrix == 0) | (matrix == 1) | missing).all(axis=0)
+    selected = (
+        (missing_ratio < 1.0)
+        & (missing_ratio <= MAX_MISSING_RATIO)
+        & (cardinality >= MIN_CARDINALITY)
+        & ~is_binary
+    )
+    return missing_ratio, cardinality, is_binary, selected
+
+
+def profile_columns(
+    df: pd.DataFrame, excluded: Iterable[str] = ()
+) -> Tuple[np.ndarray, List[ColumnProfile]]:
+    """Profile every candidate column in one vectorized pass.
+
+    Returns the coerced float matrix (one column per candidate) and the
+    per-column profiles, in ``df`` column order.
+    """
+
+    excluded = set(excluded)
+    columns = [column for column in df.columns if column not in excluded]
+    matrix = _coerce_numeric(df, columns)
+    missing_ratio, cardinality, is_binary, selected = _column_checks(matrix)
+    # Recorded values of which none parse as numbers.
+    is_text = (missing_ratio == 1.0) & df[columns].notna().any(axis=0).to_numpy()
+
+    profiles = [
+        ColumnProfile(
+            name=str(column),
+            missing_ratio=float(missing_ratio[idx]),
+            cardinality=int(cardinality[idx]),
+            is_binary=bool(is_binary[idx]),
+            is_text=bool(is_text[idx]),
+            selected=bool(selected[idx]),
+        )
+        for idx, column in enumerate(columns)
+    ]
+    return matrix, profiles
+
+
+class SchemaCache:
+    """Selected columns per recorder layout, persisted as JSON files.
+
+    Keyed by the header signature plus ``PROFILE_VERSION``. An empty
+    ``directory`` keeps the cache in memory only.
+    """
+
+    def __init__(self, directory: Optional[str] = SCHEMA_CACHE_DIR) -> None:
+        self.directory = Path(directory) if directory else None
+        self._memory: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def key(self, columns: Iterable[object]) -> str:
+        return f"v{PROFILE_VERSION}-{header_signature(columns)}"
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            schema = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._memory[key] = schema
+        return schema
+
+    def put(self, key: str, schema: Dict[str, object]) -> None:
+        with self._lock:
+            self._memory[key] = schema
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{key}.json"
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(schema))
+            os.replace(tmp_path, path)
+        except OSError:
+            # A read-only or missing cache directory only costs a re-profile.
+            pass
+
+
+SCHEMA_CACHE = SchemaCache()
+
+
+def select_numeric_columns(
+    df: pd.DataFrame,
+    excluded: Iterable[str] = (),
+    cache: Optional[SchemaCache] = SCHEMA_CACHE,
+) -> Tuple[pd.DataFrame, List[str]]:
+    key = cache.key(df.columns) if cache is not None else None
+    schema = cache.get(key) if cache is not None else None
+    if schema is not None:
+        # The header only rules out text columns. Every other column is
+        # re-checked on this flight's data, so a dead or stuck channel is
+        # dropped (and a recovered one kept) exactly as a fresh profile would.
+        candidates = [column for column in schema["candidates"] if column in df.columns]
+        matrix = _coerce_numeric(df, candidates)
+        keep = np.flatnonzero(_column_checks(matrix)[3])
+        selected = [candidates[idx] for idx in keep]
+        matrix = matrix[:, keep]
+    else:
+        matrix, profiles = profile_columns(df, excluded)
+        keep = [idx for idx, profile in enumerate(profiles) if profile.selected]
+        selected = [profiles[idx].name for idx in keep]
+        matrix = matrix[:, keep]
+        if cache is not None:
+            cache.put(
+                key,
+                {
+                    "selected": selected,
+                    "candidates": [profile.name for profile in profiles if not profile.is_text],
+                    "profiles": [asdict(profile) for profile in profiles],
+                },
+            )
+
+    if not selected:
+        raise ValueError("No numeric parameters available for anomaly detection.")
+
+    return pd.DataFrame(matrix, columns=selected), selected
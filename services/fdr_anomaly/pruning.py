@@ -0,0 +1,122 @@
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.fdr_anomaly.flight import header_signature
+from services.fdr_anomaly.profiling import SCHEMA_CACHE, SchemaCache
+
+
+# Bump when the clustering rule changes so stale cached decisions are ignored.
+PRUNING_VERSION = 1
+DEFAULT_PRUNE_CHANNELS = os.getenv("FDR_PRUNE_CHANNELS", "0").lower() in {"1", "true", "yes"}
+PRUNE_CORRELATION = float(os.getenv("FDR_PRUNE_CORRELATION", "0.98"))
+
+
+@dataclass
+class ChannelCluster:
+    representative: str
+    members: List[str]
+    min_abs_correlation: float
+
+
+@dataclass
+class ChannelPruning:
+    """Which parameters are modelled and which ones they stand in for."""
+
+    threshold: float
+    clusters: List[ChannelCluster]
+    cached: bool = False
+
+    @property
+    def representatives(self) -> List[str]:
+        return [cluster.representative for cluster in self.clusters]
+
+    def member_index(self, feature_names: Sequence[str]) -> np.ndarray:
+        """Column of the representative modelling each of ``feature_names``."""
+
+        position = {cluster.representative: idx for idx, cluster in enumerate(self.clusters)}
+        owner = {
+            member: position[cluster.representative]
+            for cluster in self.clusters
+            for member in cluster.members
+        }
+        return np.array([owner[name] for name in feature_names], dtype=np.intp)
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "threshold": self.threshold,
+            "cached": self.cached,
+            "modelled": self.representatives,
+            "clusters": [asdict(cluster) for cluster in self.clusters if len(cluster.members) > 1],
+        }
+
+
+def abs_correlation(values: np.ndarray) -> np.ndarray:
+    """Absolute Pearson correlation between columns, 0 for constant columns."""
+
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt(np.einsum("ij,ij->j", centered, centered))
+    norms[norms == 0.0] = np.inf
+    unit = centered / norms
+    corr = np.abs(unit.T @ unit)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def cluster_channels(
+    values: np.ndarray, feature_names: Sequence[str], threshold: float = PRUNE_CORRELATION
+) -> ChannelPruning:
+    """Group parameters whose training-slice correlation reaches ``threshold``.
+
+    Leader clustering in column order: the first unassigned parameter becomes
+    a representative and absorbs every unassigned parameter correlated with
+    it at or above the threshold.
+    """
+
+    corr = abs_correlation(values)
+    unassigned = np.ones(len(feature_names), dtype=bool)
+    clusters = []
+    for idx in range(len(feature_names)):
+        if not unassigned[idx]:
+            continue
+        members = np.where(unassigned & (corr[idx] >= threshold))[0]
+        unassigned[members] = False
+        clusters.append(
+            ChannelCluster(
+                representative=str(feature_names[idx]),
+                members=[str(feature_names[member]) for member in members],
+                min_abs_correlation=float(corr[idx, members].min()),
+            )
+        )
+    return ChannelPruning(threshold=float(threshold), clusters=clusters)
+
+
+def prune_channels(
+    values: np.ndarray,
+    feature_names: Sequence[str],
+    threshold: float = PRUNE_CORRELATION,
+    cache: Optional[SchemaCache] = SCHEMA_CACHE,
+) -> ChannelPruning:
+    """Cluster redundant parameters, reusing the decision for a known schema."""
+
+    key = f"prune-v{PRUNING_VERSION}-{header_signature(feature_names)}-{threshold:g}"
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return ChannelPruning(
+            threshold=float(cached["threshold"]),
+            clusters=[ChannelCluster(**cluster) for cluster in cached["clusters"]],
+            cached=True,
+        )
+
+    pruning = cluster_channels(values, feature_names, threshold)
+    if cache is not None:
+        cache.put(
+            key,
+            {
+                "threshold": pruning.threshold,
+                "clusters": [asdict(cluster) for cluster in pruning.clusters],
+            },
+        )
+    return pruning
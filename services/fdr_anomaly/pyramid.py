@@ -0,0 +1,209 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.fdr_anomaly.stage_cache import RUN_CACHE, RunCache
+
+
+PYRAMID_FACTOR = int(os.getenv("FDR_PYRAMID_FACTOR", "4"))
+PYRAMID_SUFFIX = ".pyramid.npz"
+_FIELDS = ("t0", "t1", "count", "min", "max", "mean")
+_FEATURE_FIELDS = ("fmin", "fmax", "fmean")
+_ROW_ALIASES = {"t1": "t0", "min": "mean", "max": "mean", "fmin": "fmean", "fmax": "fmean"}
+
+
+def _coarsen(level: Dict[str, np.ndarray], factor: int) -> Dict[str, np.ndarray]:
+    n_buckets = level["t0"].shape[0]
+    starts = np.arange(0, n_buckets, factor)
+    ends = np.minimum(starts + factor, n_buckets) - 1
+    count = np.add.reduceat(level["count"], starts)
+    coarse = {
+        "t0": level["t0"][starts],
+        "t1": level["t1"][ends],
+        "count": count,
+        "min": np.minimum.reduceat(level["min"], starts),
+        "max": np.maximum.reduceat(level["max"], starts),
+        "sum": np.add.reduceat(level["sum"], starts),
+    }
+    if "fsum" in level:
+        coarse["fmin"] = np.minimum.reduceat(level["fmin"], starts, axis=0)
+        coarse["fmax"] = np.maximum.reduceat(level["fmax"], starts, axis=0)
+        coarse["fsum"] = np.add.reduceat(level["fsum"], starts, axis=0)
+    return coarse
+
+
+class TimelinePyramid:
+    """Min/max/mean pyramid over a score timeline.
+
+    Level 0 holds one bucket per row. Each level above merges ``factor``
+    buckets of the one below, down to a single bucket, so a query of any
+    ``width`` has a level that fits. Scores are stored as float32 and bucket
+    bounds as float64 timestamps.
+    """
+
+    def __init__(self, levels: List[Dict[str, np.ndarray]], feature_names: Sequence[str]) -> None:
+        self.levels = levels
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def build(
+        cls,
+        timestamps: np.ndarray,
+        scores: np.ndarray,
+        feature_scores: Optional[np.ndarray] = None,
+        feature_names: Sequence[str] = (),
+        factor: int = PYRAMID_FACTOR,
+    ) -> "TimelinePyramid":
+        timestamps = np.asarray(timestamps, dtype=float)
+        scores = np.asarray(scores, dtype=float)
+        level = {
+            "t0": timestamps,
+            "t1": timestamps,
+            "count": np.ones(scores.shape[0], dtype=np.int64),
+            "min": scores,
+            "max": scores,
+            "sum": scores,
+        }
+        if feature_scores is not None:
+            feature_scores = np.asarray(feature_scores, dtype=float)
+            level.update(fmin=feature_scores, fmax=feature_scores, fsum=feature_scores)
+
+        factor = max(2, factor)
+        levels = [level]
+        while levels[-1]["t0"].shape[0] > 1:
+            levels.append(_coarsen(levels[-1], factor))
+        return cls([cls._finish(level) for level in levels], feature_names)
+
+    @staticmethod
+    def _finish(level: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        count = level["count"]
+        finished = {
+            "t0": level["t0"],
+            "t1": level["t1"],
+            "count": count.astype(np.int32),
+            "min": level["min"].astype(np.float32),
+            "max": level["max"].astype(np.float32),
+            "mean": (level["sum"] / count).astype(np.float32),
+        }
+        if "fsum" in level:
+            finished["fmin"] = level["fmin"].astype(np.float32)
+            finished["fmax"] = level["fmax"].astype(np.float32)
+            finished["fmean"] = (level["fsum"] / count[:, None]).astype(np.float32)
+        return finished
+
+    def save(self, path: Path) -> Path:
+        arrays = {"feature_names": np.array(self.feature_names, dtype=str)}
+        for idx, level in enumerate(self.levels):
+            for name, values in level.items():
+                # Level 0 buckets are single rows: bounds coincide and min = max = mean.
+                if idx == 0 and name in _ROW_ALIASES:
+                    continue
+                arrays[f"L{idx}_{name}"] = values
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "TimelinePyramid":
+        with np.load(path) as archive:
+            names = set(archive.files)
+            levels = []
+            while f"L{len(levels)}_t0" in names:
+                idx = len(levels)
+                level = {
+                    name: archive[f"L{idx}_{name}"]
+                    for name in _FIELDS + _FEATURE_FIELDS
+                    if f"L{idx}_{name}" in names
+                }
+                for alias, source in _ROW_ALIASES.items():
+                    if alias not in level and source in level:
+                        level[alias] = level[source]
+                levels.append(level)
+            feature_names = archive["feature_names"].tolist()
+        return cls(levels, feature_names)
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        width: int = 1000,
+        features: Optional[Sequence[str]] = None,
+    ) -> Dict[str, object]:
+        """Buckets covering ``[start, end]`` at the finest level that fits ``width``.
+
+        ``width`` is the number of points the caller can draw (e.g. pixels).
+        Per-feature min/max/mean are returned for the requested ``features``.
+        """
+
+        width = max(1, int(width))
+        chosen = len(self.levels) - 1
+        bounds = (0, 0)
+        for idx, level in enumerate(self.levels):
+            lo = 0 if start is None else int(np.searchsorted(level["t1"], start, side="left"))
+            hi = (
+                level["t0"].shape[0]
+                if end is None
+                else int(np.searchsorted(level["t0"], end, side="right"))
+            )
+            bounds = (lo, hi)
+            chosen = idx
+            if hi - lo <= width:
+                break
+
+        level = self.levels[chosen]
+        lo, hi = bounds
+        result: Dict[str, object] = {
+            "level": chosen,
+            "bucket_rows": int(level["count"][lo:hi].max()) if hi > lo else 0,
+            "time_start": level["t0"][lo:hi].round(4).tolist(),
+            "time_end": level["t1"][lo:hi].round(4).tolist(),
+            "min": np.round(level["min"][lo:hi].astype(float), 6).tolist(),
+            "max": np.round(level["max"][lo:hi].astype(float), 6).tolist(),
+            "mean": np.round(level["mean"][lo:hi].astype(float), 6).tolist(),
+        }
+        if features and "fmean" in level:
+            column = {name: idx for idx, name in enumerate(self.feature_names)}
+            unknown = [name for name in features if name not in column]
+            if unknown:
+                raise KeyError(f"Unknown parameters: {', '.join(unknown)}")
+            result["features"] = {
+                name: {
+                    stat: np.round(level[field][lo:hi, column[name]].astype(float), 6).tolist()
+                    for stat, field in (("min", "fmin"), ("max", "fmax"), ("mean", "fmean"))
+                }
+                for name in features
+            }
+        return result
+
+
+def query_range(
+    path: Path,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    width: int = 1000,
+    features: Optional[Sequence[str]] = None,
+) -> Dict[str, object]:
+    return TimelinePyramid.load(path).query(start, end, width, features)
+
+
+def query_run(
+    run_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    width: int = 1000,
+    features: Optional[Sequence[str]] = None,
+    cache: Optional[RunCache] = None,
+) -> Dict[str, object]:
+    cache = cache or RUN_CACHE
+    if cache is None:
+        raise ValueError("Timeline queries need FDR_RUN_CACHE_DIR to be set.")
+    path = cache.path(run_id, PYRAMID_SUFFIX)
+    if not path.exists():
+        raise ValueError(f"Run {run_id!r} has no timeline pyramid.")
+    result = query_range(path, start, end, width, features)
+    result["run_id"] = run_id
+    return result
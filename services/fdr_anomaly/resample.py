@@ -0,0 +1,140 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.fdr_anomaly.flight import TIME_COLUMN, FlightFrame
+
+
+# 0 disables resampling: every recorded row is one time step.
+DEFAULT_RESAMPLE_HZ = float(os.getenv("FDR_RESAMPLE_HZ", "0"))
+DEFAULT_AGGREGATION = "mean"
+AGGREGATIONS = {"mean", "min", "max", "first", "last", "median"}
+
+# First matching token wins. Angles and positions would be smeared by a mean
+# across a wrap or a turn, and discrete quality counts keep their worst value.
+AGGREGATION_RULES = (
+    ("heading", "last"),
+    ("track", "last"),
+    ("latitude", "last"),
+    ("longitude", "last"),
+    ("gps fix quality", "min"),
+    ("satellites", "min"),
+    ("time", "first"),
+)
+
+
+def aggregation_for(
+    column: str, series: pd.Series, rules: Optional[Dict[str, str]] = None
+) -> str:
+    if rules and column in rules:
+        return rules[column]
+    if not pd.api.types.is_numeric_dtype(series):
+        return "last"
+    lowered = column.lower()
+    for token, aggregation in AGGREGATION_RULES:
+        if token in lowered:
+            return aggregation
+    return DEFAULT_AGGREGATION
+
+
+def resample_frame(
+    frame: FlightFrame, hz: float, rules: Optional[Dict[str, str]] = None
+) -> FlightFrame:
+    """Aggregate ``frame`` onto a uniform ``hz`` grid anchored at its first sample.
+
+    Only occupied grid slots become rows, so recording dropouts stay gaps
+    rather than being filled. Rows without a finite ``Session Time`` have no
+    slot and are dropped. ``source_rows`` on the result holds the first and
+    last file row behind each new row, counted before any sorting. The
+    result is memoized on ``frame`` so every detector of an ingest shares it.
+    """
+
+    if hz <= 0:
+        return frame
+    unknown = sorted({value for value in (rules or {}).values()} - AGGREGATIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown aggregation(s) {', '.join(unknown)}; "
+            f"expected one of {sorted(AGGREGATIONS)}."
+        )
+    key = f"resample.{hz:g}.{sorted((rules or {}).items())}"
+    return frame.cached(key, lambda: _resample(frame, hz, rules))
+
+
+def _resample(frame: FlightFrame, hz: float, rules: Optional[Dict[str, str]]) -> FlightFrame:
+    if frame.n_rows == 0:
+        return frame
+    positions = frame.row_order if frame.row_order is not None else np.arange(frame.n_rows)
+    finite = np.isfinite(frame.timestamps)
+    if not finite.any():
+        raise ValueError("Cannot resample a flight with no finite 'Session Time' values.")
+    timestamps = frame.timestamps[finite]
+    positions = positions[finite]
+    period = 1.0 / hz
+    origin = float(timestamps[0])
+    slots = np.floor((timestamps - origin) / period + 1e-9).astype(np.int64)
+    # Timestamps are sorted, so each slot is one contiguous block of rows.
+    new_slot = np.r_[True, slots[1:] != slots[:-1]]
+    starts = np.flatnonzero(new_slot)
+    block = np.cumsum(new_slot) - 1
+
+    data = frame.data.drop(columns=[TIME_COLUMN])
+    if not finite.all():
+        data = data[finite].reset_index(drop=True)
+    aggregations = {
+        column: aggregation_for(column, data[column], rules) for column in data.columns
+    }
+    grouped = data.groupby(block, sort=False)
+    columns: List[pd.DataFrame] = []
+    for aggregation in sorted(set(aggregations.values())):
+        names = [column for column, rule in aggregations.items() if rule == aggregation]
+        columns.append(getattr(grouped[names], aggregation)())
+    resampled = pd.concat(columns, axis=1)[list(data.columns)].reset_index(drop=True)
+
+    grid = origin + slots[starts] * period
+    resampled.insert(frame.data.columns.get_loc(TIME_COLUMN), TIME_COLUMN, grid)
+    # Sorting may have interleaved file rows, so a slot spans the lowest to
+    # the highest file row aggregated into it.
+    source_rows = np.column_stack(
+        (np.minimum.reduceat(positions, starts), np.maximum.reduceat(positions, starts))
+    )
+    return FlightFrame(
+        source=frame.source,
+        data=resampled,
+        timestamps=grid,
+        source_rows=source_rows,
+        source_row_count=frame.n_rows,
+        sample_hz=hz,
+    )
+
+
+def attach_source_rows(
+    segments: List[Dict[str, object]], timestamps: np.ndarray, source_rows: Optional[np.ndarray]
+) -> None:
+    """Add the original ``start_row``/``end_row`` behind each segment of a resampled frame."""
+
+    if source_rows is None:
+        return
+    for segment in segments:
+        start_time = segment.get("start_time")
+        end_time = segment.get("end_time")
+        if start_time is None or end_time is None:
+            continue
+        first = int(np.searchsorted(timestamps, start_time, side="left"))
+        last = int(np.searchsorted(timestamps, end_time, side="right")) - 1
+        if last < first:
+            continue
+        segment["start_row"] = int(source_rows[first, 0])
+        segment["end_row"] = int(source_rows[last, 1])
+
+
+def describe_resampling(frame: FlightFrame) -> Optional[Dict[str, object]]:
+    if frame.source_rows is None:
+        return None
+    return {
+        "hz": frame.sample_hz,
+        "source_rows": frame.source_row_count,
+        "rows": frame.n_rows,
+    }
@@ -6,16 +6,126 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from services.fdr_anomaly.autoencoder import detect_to_json
+from services.fdr_anomaly.autoencoder import (
+    DEFAULT_MULTIRES,
+    DEFAULT_THRESHOLD_PERCENTILE,
+    DEFAULT_WARM_START,
+    detect_to_json,
+    resegment_to_json,
+)
+from services.fdr_anomaly.engine import analyze_to_json
+from services.fdr_anomaly.resample import DEFAULT_RESAMPLE_HZ
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run unsupervised FDR anomaly detection.")
-    parser.add_argument("path", help="Path to CSV or Excel file with Session Time column.")
+    parser.add_argument(
+        "path", nargs="?", help="Path to CSV or Excel file with Session Time column."
+    )
+    parser.add_argument(
+        "--detectors",
+        default=None,
+        help="Comma-separated detectors to run on a single ingest "
+        "(autoencoder, mad_iforest, python_model). Returns a combined payload.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run the selected detectors concurrently.",
+    )
+    parser.add_argument(
+        "--multires",
+        action="store_true",
+        help="Scan long recordings coarse-to-fine with the autoencoder "
+        "(same as FDR_MULTIRES=1).",
+    )
+    parser.add_argument(
+        "--resegment",
+        metavar="RUN_ID",
+        default=None,
+        help="Re-threshold a cached run (FDR_RUN_CACHE_DIR) without rerunning the model.",
+    )
+    parser.add_argument(
+        "--threshold-percentile",
+        type=float,
+        default=None,
+        help="Anomaly threshold percentile (default FDR_THRESHOLD_PERCENTILE).",
+    )
+    parser.add_argument(
+        "--flight-id",
+        default=None,
+        help="Flight identifier; with FDR_SIMILARITY_INDEX_DIR set, detected segments "
+        "are added to the similarity index under it.",
+    )
+    parser.add_argument("--case-id", default=None, help="Case the flight belongs to.")
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Fine-tune the schema's fleet base model instead of training from scratch "
+        "(same as FDR_WARM_START=1).",
+    )
+    parser.add_argument(
+        "--resample-hz",
+        type=float,
+        default=DEFAULT_RESAMPLE_HZ,
+        help="Aggregate rows onto a uniform grid at this rate before detection "
+        "(default FDR_RESAMPLE_HZ; 0 keeps every row).",
+    )
     args = parser.parse_args()
+    if not args.path and not args.resegment:
+        parser.error("a flight path or --resegment RUN_ID is required")
+    threshold_percentile = (
+        DEFAULT_THRESHOLD_PERCENTILE
+        if args.threshold_percentile is None
+        else args.threshold_percentile
+    )
 
     try:
-        output = detect_to_json(args.path)
+        if args.resegment:
+            output = resegment_to_json(args.resegment, threshold_percentile)
+        elif args.detectors:
+            detectors = [name.strip() for name in args.detectors.split(",") if name.strip()]
+            autoencoder_flags = [
+                flag
+                for flag, value in (
+                    ("--multires", args.multires),
+                    ("--threshold-percentile", args.threshold_percentile is not None),
+                    ("--flight-id", args.flight_id is not None),
+                    ("--case-id", args.case_id is not None),
+                    ("--warm-start", args.warm_start),
+                )
+                if value
+            ]
+            if autoencoder_flags and "autoencoder" not in detectors:
+                parser.error(
+                    f"{', '.join(autoencoder_flags)} only apply to the autoencoder detector"
+                )
+            # The pretrained model expects the recorder's native rate.
+            options = {
+                name: {"resample_hz": args.resample_hz}
+                for name in ("autoencoder", "mad_iforest")
+                if args.resample_hz > 0
+            }
+            options.setdefault("autoencoder", {}).update(
+                multires=args.multires or DEFAULT_MULTIRES,
+                threshold_percentile=threshold_percentile,
+                flight_id=args.flight_id,
+                case_id=args.case_id,
+                warm_start=args.warm_start or DEFAULT_WARM_START,
+            )
+            output = analyze_to_json(
+                args.path, detectors=detectors, parallel=args.parallel, options=options
+            )
+        else:
+            output = detect_to_json(
+                args.path,
+                multires=args.multires or DEFAULT_MULTIRES,
+                threshold_percentile=threshold_percentile,
+                flight_id=args.flight_id,
+                case_id=args.case_id,
+                resample_hz=args.resample_hz,
+                warm_start=args.warm_start or DEFAULT_WARM_START,
+            )
     except Exception as exc:  # noqa: BLE001
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -0,0 +1,338 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Dict, List, Optional, Tuple
+
+# Keep this module free of numpy/pandas imports: job processes must set their
+# BLAS/OpenMP thread caps before those libraries are first loaded.
+
+DEFAULT_THREADS_PER_JOB = int(os.getenv("FDR_JOB_THREADS", "2"))
+DEFAULT_MAX_WORKERS = int(
+    os.getenv(
+        "FDR_SCHEDULER_WORKERS",
+        str(max(1, (os.cpu_count() or 1) // max(1, DEFAULT_THREADS_PER_JOB))),
+    )
+)
+DEFAULT_JOB_TIMEOUT = float(os.getenv("FDR_JOB_TIMEOUT", "0")) or None
+FINISHED_JOB_RETENTION = 500
+# Results hold a whole flight's timeline, so they are released once fetched
+# or after this many seconds, whichever comes first; the job record stays.
+RESULT_RETENTION_SECONDS = float(os.getenv("FDR_JOB_RESULT_TTL", "3600"))
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timeout"
+TERMINAL_STATUSES = {SUCCEEDED, FAILED, CANCELLED, TIMED_OUT}
+
+
+@dataclass
+class Job:
+    job_id: str
+    path: str
+    priority: int
+    timeout: Optional[float]
+    detectors: Optional[List[str]]
+    options: Dict[str, object]
+    status: str = QUEUED
+    stage: str = QUEUED
+    progress: float = 0.0
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, object]] = None
+    result_released: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "path": self.path,
+            "priority": self.priority,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 4),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": self.wait_seconds,
+            "result_released": self.result_released,
+            "error": self.error,
+        }
+
+
+def _run_job(path: str, detectors, options, threads: int, conn: Connection) -> None:
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    def report(stage: str, fraction: float) -> None:
+        conn.send(("progress", (stage, fraction)))
+
+    try:
+        import importlib.util
+
+        if importlib.util.find_spec("torch") is not None:
+            import torch
+
+            torch.set_num_threads(threads)
+
+        report("loading", 0.0)
+        if detectors:
+            from services.fdr_anomaly.engine import analyze
+
+            result = analyze(path, detectors=detectors, options=options)
+        else:
+            from services.fdr_anomaly.autoencoder import detect_anomalies
+
+            result = detect_anomalies(path, progress=report, **options)
+        conn.send(("result", result))
+    except Exception as exc:  # noqa: BLE001
+        conn.send(("error", str(exc)))
+    finally:
+        conn.close()
+
+
+class JobScheduler:
+    """Bounded pool of detector processes fed from a priority queue.
+
+    Each job runs in its own spawned process with BLAS/OpenMP and torch
+    thread counts capped at ``threads_per_job``, so ``max_workers`` jobs
+    never oversubscribe the CPU. Higher ``priority`` values run first; ties
+    run in submission order. Running jobs can be cancelled or time out, in
+    which case their process is terminated.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        threads_per_job: int = DEFAULT_THREADS_PER_JOB,
+        default_timeout: Optional[float] = DEFAULT_JOB_TIMEOUT,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.threads_per_job = max(1, threads_per_job)
+        self.default_timeout = default_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs: Dict[str, Job] = {}
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        # Each running job talks over its own pipe so terminating one process
+        # can never corrupt the channel of another.
+        self._processes: Dict[str, Tuple[multiprocessing.process.BaseProcess, Connection]] = {}
+        self._condition = threading.Condition()
+        self._running = True
+        self._monitor = threading.Thread(target=self._monitor_loop, name="fdr-scheduler", daemon=True)
+        self._monitor.start()
+
+    def submit(
+        self,
+        path: str,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        detectors: Optional[List[str]] = None,
+        options: Optional[Dict[str, object]] = None,
+    ) -> Job:
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            path=path,
+            priority=priority,
+            timeout=timeout if timeout is not None else self.default_timeout,
+            detectors=detectors,
+            options=options or {},
+        )
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("Scheduler is shut down.")
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._queue, (-priority, next(self._sequence), job.job_id))
+            self._condition.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def take_result(self, job_id: str) -> Optional[Dict[str, object]]:
+        """Hand over a succeeded job's result and release it from memory."""
+
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.result is None:
+                return None
+            result, job.result = job.result, None
+            job.result_released = "fetched"
+            return result
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return job
+            self._finish(job, CANCELLED, error="Cancelled by request.")
+            self._condition.notify_all()
+            return job
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            now = time.time()
+            queued = [job for job in self._jobs.values() if job.status == QUEUED]
+            waits = [
+                job.wait_seconds for job in self._jobs.values() if job.wait_seconds is not None
+            ]
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "max_workers": self.max_workers,
+                "threads_per_job": self.threads_per_job,
+                "queue_depth": len(queued),
+                "running": len(self._processes),
+                "oldest_queued_seconds": max((now - job.submitted_at for job in queued), default=0.0),
+                "mean_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait_seconds": max(waits, default=0.0),
+                "jobs_by_status": counts,
+            }
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._running = False
+            for job in list(self._jobs.values()):
+                if job.status not in TERMINAL_STATUSES:
+                    self._finish(job, CANCELLED, error="Scheduler shut down.")
+            self._condition.notify_all()
+        self._monitor.join(timeout=5)
+
+    def _finish(self, job: Job, status: str, result=None, error: Optional[str] = None) -> None:
+        # Caller holds the condition lock.
+        job.status = status
+        job.stage = status
+        job.finished_at = time.time()
+        job.result = result
+        job.error = error
+        if status == SUCCEEDED:
+            job.progress = 1.0
+        entry = self._processes.pop(job.job_id, None)
+        if entry is not None:
+            process, conn = entry
+            if status == SUCCEEDED:
+                process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self._prune_finished()
+
+    def _prune_finished(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status in TERMINAL_STATUSES]
+        expired = time.time() - RESULT_RETENTION_SECONDS
+        for job in finished:
+            if job.result is not None and (job.finished_at or 0.0) < expired:
+                job.result = None
+                job.result_released = "expired"
+        if len(finished) <= FINISHED_JOB_RETENTION:
+            return
+        finished.sort(key=lambda job: job.finished_at or 0.0)
+        for job in finished[: len(finished) - FINISHED_JOB_RETENTION]:
+            del self._jobs[job.job_id]
+
+    def _next_queued(self) -> Optional[Job]:
+        while self._queue:
+            _, _, job_id = heapq.heappop(self._queue)
+            job = self._jobs.get(job_id)
+            # Cancelled jobs are left in the heap and skipped here.
+            if job is not None and job.status == QUEUED:
+                return job
+        return None
+
+    def _monitor_loop(self) -> None:
+        while True:
+            with self._condition:
+                if not self._running:
+                    break
+                self._expire_timeouts()
+                self._prune_finished()
+                while len(self._processes) < self.max_workers:
+                    job = self._next_queued()
+                    if job is None:
+                        break
+                    self._start(job)
+                connections = {conn: job_id for job_id, (_, conn) in self._processes.items()}
+                if not connections:
+                    self._condition.wait(timeout=0.5)
+                    continue
+
+            try:
+                ready = wait(list(connections), timeout=0.2)
+            except OSError:
+                # A connection was closed by a concurrent cancel; re-snapshot.
+                continue
+            for conn in ready:
+                try:
+                    kind, value = conn.recv()
+                except (EOFError, OSError):
+                    kind, value = "exit", None
+                with self._condition:
+                    self._handle_event(connections[conn], kind, value)
+
+        with self._condition:
+            for process, conn in self._processes.values():
+                if process.is_alive():
+                    process.terminate()
+                conn.close()
+            self._processes.clear()
+
+    def _handle_event(self, job_id: str, kind: str, value) -> None:
+        # Caller holds the condition lock.
+        job = self._jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        if kind == "progress":
+            job.stage, job.progress = value
+        elif kind == "result":
+            self._finish(job, SUCCEEDED, result=value)
+        elif kind == "error":
+            self._finish(job, FAILED, error=value)
+        else:
+            process, _ = self._processes[job_id]
+            process.join(timeout=1)
+            self._finish(job, FAILED, error=f"Job process exited with code {process.exitcode}.")
+
+    def _start(self, job: Job) -> None:
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_job,
+            args=(job.path, job.detectors, job.options, self.threads_per_job, sender),
+            daemon=True,
+        )
+        job.status = RUNNING
+        job.stage = "starting"
+        job.started_at = time.time()
+        process.start()
+        sender.close()
+        self._processes[job.job_id] = (process, receiver)
+
+    def _expire_timeouts(self) -> None:
+        now = time.time()
+        for job_id in list(self._processes):
+            job = self._jobs[job_id]
+            if job.timeout and job.started_at and now - job.started_at > job.timeout:
+                self._finish(job, TIMED_OUT, error=f"Job exceeded {job.timeout:g}s timeout.")
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+MEDIUM_SEVERITY_PERCENTILE = 90.0
+
+
+def _is_constant(first: float, minimum: float, maximum: float) -> bool:
+    # Same tolerance as np.allclose(scores, scores[0]), evaluated from the
+    # extremes so the full timeline is not rescanned. NaN compares False.
+    tolerance = 1e-8 + 1e-5 * abs(first)
+    return bool(maximum - first <= tolerance and first - minimum <= tolerance)
+
+
+@dataclass(frozen=True)
+class ScoreStats:
+    """Timeline score statistics computed once per run.
+
+    Thresholding, severity banding and review-segment selection all read
+    from this object instead of re-scanning the timeline per segment.
+    """
+
+    count: int
+    minimum: float
+    maximum: float
+    is_constant: bool
+    quantiles: Dict[float, float]
+
+    @classmethod
+    def from_scores(
+        cls, scores: np.ndarray, percentiles: Iterable[float] = (MEDIUM_SEVERITY_PERCENTILE,)
+    ) -> "ScoreStats":
+        percentiles = sorted({float(value) for value in percentiles})
+        if scores.size == 0:
+            return cls(0, 0.0, 0.0, True, {value: 0.0 for value in percentiles})
+        values = np.percentile(scores, percentiles) if percentiles else []
+        minimum = float(np.min(scores))
+        maximum = float(np.max(scores))
+        return cls(
+            count=int(scores.size),
+            minimum=minimum,
+            maximum=maximum,
+            is_constant=_is_constant(float(scores[0]), minimum, maximum),
+            quantiles={pct: float(value) for pct, value in zip(percentiles, values)},
+        )
+
+    def quantile(self, percentile: float) -> float:
+        return self.quantiles[float(percentile)]
+
+    def flag(self, scores: np.ndarray, threshold: float) -> np.ndarray:
+        if self.is_constant:
+            return np.zeros_like(scores, dtype=bool)
+        return scores >= threshold
+
+    def severity(self, score: float, high_threshold: float) -> str:
+        if self.is_constant:
+            return "low"
+        if score >= high_threshold:
+            return "high"
+        if score >= self.quantile(MEDIUM_SEVERITY_PERCENTILE):
+            return "med"
+        return "low"
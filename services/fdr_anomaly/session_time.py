@@ -0,0 +1,254 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.1
+    from pandas.core.tools.datetimes import guess_datetime_format
+
+
+SNIFF_SAMPLE_SIZE = 200
+CLOCK_PATTERN = re.compile(r"^\d{2}:\d{2}:\d{2}(\.\d+)?$")
+FALLBACK_DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S.%f",
+    "%d/%m/%Y %H:%M:%S",
+)
+FIXED_WIDTH_DIRECTIVES = {"Y": 4, "m": 2, "d": 2, "H": 2, "M": 2, "S": 2}
+
+
+@dataclass(frozen=True)
+class TimeFormat:
+    kind: str
+    pattern: Optional[str] = None
+
+
+@dataclass
+class ParsedTime:
+    seconds: np.ndarray
+    is_sorted: bool
+    time_format: TimeFormat
+
+
+def _is_sorted(values: np.ndarray) -> bool:
+    # NaN comparisons are False, so columns with gaps are treated as unsorted.
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def _fixed_width_layout(
+    pattern: str, width: int
+) -> Optional[Tuple[Dict[str, Tuple[int, int]], List[Tuple[int, int]]]]:
+    fields: Dict[str, Tuple[int, int]] = {}
+    literals: List[Tuple[int, int]] = []
+    position = 0
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char != "%":
+            literals.append((position, ord(char)))
+            position += 1
+            idx += 1
+            continue
+        directive = pattern[idx + 1 : idx + 2]
+        if directive == "f":
+            # Fractions are only fixed-width when they close the pattern.
+            if idx + 2 != len(pattern) or width <= position:
+                return None
+            field_width = width - position
+        elif directive in FIXED_WIDTH_DIRECTIVES:
+            field_width = FIXED_WIDTH_DIRECTIVES[directive]
+        else:
+            return None
+        fields[directive] = (position, position + field_width)
+        position += field_width
+        idx += 2
+    if position != width:
+        return None
+    return fields, literals
+
+
+def _parse_fixed_width(series: pd.Series, pattern: str) -> Optional[np.ndarray]:
+    """Parse equal-width strings by slicing digit columns of a byte matrix.
+
+    Returns seconds since zero for clock times; for dates the day part is
+    taken relative to the first row to keep full float precision. Returns
+    ``None`` when any row does not fit the layout.
+    """
+
+    if series.empty or not series.notna().all():
+        return None
+    try:
+        encoded = series.to_numpy(dtype="S")
+    except (UnicodeEncodeError, ValueError, TypeError):
+        return None
+    width = encoded.dtype.itemsize
+    layout = _fixed_width_layout(pattern, width)
+    if layout is None:
+        return None
+    fields, literals = layout
+
+    raw = encoded.view(np.uint8).reshape(-1, width)
+    # Shorter rows are NUL padded, so a full last column means equal widths.
+    if not np.all(raw[:, -1]):
+        return None
+    for position, code in literals:
+        if not np.all(raw[:, position] == code):
+            return None
+    digits = raw - np.uint8(ord("0"))
+    for start, end in fields.values():
+        # uint8 wraps non-digits below "0" around to large values.
+        if np.any(digits[:, start:end] > 9):
+            return None
+
+    def number(directive: str) -> np.ndarray:
+        start, end = fields[directive]
+        weights = 10 ** np.arange(end - start - 1, -1, -1, dtype=np.int64)
+        return digits[:, start:end].astype(np.int64) @ weights
+
+    seconds = np.zeros(raw.shape[0], dtype=float)
+    if "H" in fields:
+        seconds += number("H") * 3600.0
+    if "M" in fields:
+        seconds += number("M") * 60.0
+    if "S" in fields:
+        seconds += number("S")
+    if "f" in fields:
+        start, end = fields["f"]
+        seconds += number("f") / float(10 ** (end - start))
+    if "Y" in fields:
+        if "m" not in fields or "d" not in fields:
+            return None
+        months = number("m")
+        days = number("d")
+        if np.any((months < 1) | (months > 12) | (days < 1) | (days > 31)):
+            return None
+        month_start = (number("Y") - 1970).astype("datetime64[Y]") + (months - 1).astype(
+            "timedelta64[M]"
+        )
+        dates = month_start.astype("datetime64[D]") + (days - 1).astype("timedelta64[D]")
+        if np.any(dates.astype("datetime64[M]") != month_start):
+            return None
+        epoch_days = dates.astype(np.int64)
+        seconds += (epoch_days - epoch_days[0]) * 86400.0
+    return seconds
+
+
+def _relative_to_first(seconds: np.ndarray) -> np.ndarray:
+    return seconds - seconds[0]
+
+
+def sniff_format(sample: pd.Series) -> TimeFormat:
+    values = sample.astype(str).str.strip()
+    if values.empty:
+        raise ValueError("Unable to parse Session Time column to numeric seconds.")
+
+    if values.str.match(CLOCK_PATTERN).all():
+        fraction_width = values.str.partition(".")[2].str.len()
+        pattern = "%H:%M:%S.%f" if fraction_width.gt(0).all() else "%H:%M:%S"
+        return TimeFormat("timedelta", pattern)
+
+    if pd.to_timedelta(values, errors="coerce").notna().any():
+        return TimeFormat("timedelta")
+
+    candidates = []
+    guessed = guess_datetime_format(values.iloc[0])
+    if guessed:
+        candidates.append(guessed)
+    candidates.extend(fmt for fmt in FALLBACK_DATETIME_FORMATS if fmt != guessed)
+    for pattern in candidates:
+        if pd.to_datetime(values, format=pattern, errors="coerce").notna().all():
+            return TimeFormat("datetime", pattern)
+
+    if pd.to_datetime(values, errors="coerce").notna().any():
+        return TimeFormat("datetime")
+
+    raise ValueError("Unable to parse Session Time column to numeric seconds.")
+
+
+def _parse_with_format(series: pd.Series, time_format: TimeFormat) -> np.ndarray:
+    if time_format.kind == "numeric":
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+
+    if time_format.pattern:
+        seconds = _parse_fixed_width(series, time_format.pattern)
+        if seconds is not None:
+            return _relative_to_first(seconds) if time_format.kind == "datetime" else seconds
+
+    if time_format.kind == "timedelta":
+        return pd.to_timedelta(series, errors="coerce").dt.total_seconds().to_numpy(dtype=float)
+
+    as_datetime = pd.to_datetime(series, format=time_format.pattern, errors="coerce")
+    base = as_datetime.iloc[0]
+    return (as_datetime - base).dt.total_seconds().to_numpy(dtype=float)
+
+
+def _legacy_parse(series: pd.Series) -> np.ndarray:
+    as_timedelta = pd.to_timedelta(series, errors="coerce")
+    if not as_timedelta.isna().all():
+        return as_timedelta.dt.total_seconds().to_numpy(dtype=float)
+
+    as_datetime = pd.to_datetime(series, errors="coerce")
+    if not as_datetime.isna().all():
+        base = as_datetime.iloc[0]
+        return (as_datetime - base).dt.total_seconds().to_numpy(dtype=float)
+
+    raise ValueError("Unable to parse Session Time column to numeric seconds.")
+
+
+class SessionTimeParser:
+    """Parses Session Time columns, remembering the format per data source.
+
+    The format is sniffed from a small sample, then applied to the full
+    column with an explicit format (or the fixed-width byte parser). Sources
+    sharing a ``source_key`` (for example the same recorder header layout)
+    reuse the detected format without sniffing.
+    """
+
+    def __init__(self, sample_size: int = SNIFF_SAMPLE_SIZE) -> None:
+        self.sample_size = sample_size
+        self._formats: Dict[str, TimeFormat] = {}
+        self._lock = threading.Lock()
+
+    def cached_format(self, source_key: str) -> Optional[TimeFormat]:
+        with self._lock:
+            return self._formats.get(source_key)
+
+    def parse(self, series: pd.Series, source_key: Optional[str] = None) -> ParsedTime:
+        if pd.api.types.is_numeric_dtype(series):
+            time_format = TimeFormat("numeric")
+            seconds = _parse_with_format(series, time_format)
+            return ParsedTime(seconds, _is_sorted(seconds), time_format)
+
+        time_format = self.cached_format(source_key) if source_key else None
+        if time_format is not None:
+            seconds = _parse_with_format(series, time_format)
+            if not np.isnan(seconds).all():
+                return ParsedTime(seconds, _is_sorted(seconds), time_format)
+
+        sample = series.dropna().head(self.sample_size)
+        try:
+            time_format = sniff_format(sample)
+            seconds = _parse_with_format(series, time_format)
+        except ValueError:
+            seconds = None
+        if seconds is None or np.isnan(seconds).all():
+            # The sample was not representative; parse the way detectors
+            # always have and do not cache a format.
+            time_format = TimeFormat("inferred")
+            seconds = _legacy_parse(series)
+        elif source_key:
+            with self._lock:
+                self._formats[source_key] = time_format
+        return ParsedTime(seconds, _is_sorted(seconds), time_format)
+
+
+SESSION_TIME_PARSER = SessionTimeParser()
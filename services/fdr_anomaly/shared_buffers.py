@@ -0,0 +1,110 @@
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SHARED_BUFFER_MODES = ("none", "shm", "mmap")
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    mode: str
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArrayPool:
+    """Allocates arrays that worker processes can attach to without copies.
+
+    ``shm`` places buffers in ``multiprocessing.shared_memory``; ``mmap`` backs
+    them with memory-mapped files in a temporary directory; ``none`` keeps
+    plain process-local arrays (no specs are produced, so nothing fans out).
+    """
+
+    def __init__(self, mode: str = "shm", directory: Optional[str] = None) -> None:
+        if mode not in SHARED_BUFFER_MODES:
+            raise ValueError(
+                f"Unknown shared buffer mode '{mode}'. Expected one of {', '.join(SHARED_BUFFER_MODES)}."
+            )
+        self.mode = mode
+        self.directory = directory
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._tempdir: Optional[tempfile.TemporaryDirectory] = None
+        self._arrays: List[np.ndarray] = []
+
+    @property
+    def shared(self) -> bool:
+        return self.mode != "none"
+
+    def empty(self, shape: Tuple[int, ...], dtype=float) -> Tuple[np.ndarray, Optional[SharedArraySpec]]:
+        dtype = np.dtype(dtype)
+        shape = tuple(int(dim) for dim in shape)
+        if self.mode == "none":
+            return np.empty(shape, dtype=dtype), None
+
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        if self.mode == "shm":
+            segment = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._segments.append(segment)
+            array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+            spec = SharedArraySpec("shm", segment.name, shape, dtype.str)
+        else:
+            if self._tempdir is None:
+                self._tempdir = tempfile.TemporaryDirectory(prefix="fdr-buffers-", dir=self.directory)
+            path = os.path.join(self._tempdir.name, f"{uuid.uuid4().hex}.bin")
+            array = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+            spec = SharedArraySpec("mmap", path, shape, dtype.str)
+        self._arrays.append(array)
+        return array, spec
+
+    def share(self, array: np.ndarray) -> Tuple[np.ndarray, Optional[SharedArraySpec]]:
+        if self.mode == "none":
+            return array, None
+        shared, spec = self.empty(array.shape, array.dtype)
+        shared[...] = array
+        return shared, spec
+
+    def close(self) -> None:
+        # Views handed out by ``empty`` must be released before the buffers
+        # backing them can be closed.
+        self._arrays.clear()
+        for segment in self._segments:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+            segment.unlink()
+        self._segments.clear()
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    def __enter__(self) -> "SharedArrayPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_ATTACHED: Dict[str, Tuple[np.ndarray, Optional[shared_memory.SharedMemory]]] = {}
+
+
+def attach(spec: SharedArraySpec) -> np.ndarray:
+    cached = _ATTACHED.get(spec.name)
+    if cached is not None:
+        return cached[0]
+
+    if spec.mode == "shm":
+        segment = shared_memory.SharedMemory(name=spec.name)
+        array = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=segment.buf)
+    else:
+        segment = None
+        array = np.memmap(spec.name, dtype=np.dtype(spec.dtype), mode="r", shape=spec.shape)
+    _ATTACHED[spec.name] = (array, segment)
+    return array
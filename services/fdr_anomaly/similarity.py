@@ -0,0 +1,316 @@
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.fdr_anomaly.flight import header_signature
+from services.fdr_anomaly.stage_cache import RUN_CACHE, RunCache
+from services.fdr_anomaly.topk import top_k_indices
+
+
+SIMILARITY_INDEX_DIR = os.getenv("FDR_SIMILARITY_INDEX_DIR", "")
+DEFAULT_SIMILAR_COUNT = int(os.getenv("FDR_SIMILAR_COUNT", "10"))
+
+
+def segment_embedding(feature_scores: np.ndarray) -> np.ndarray:
+    """Unit-length mean per-parameter error profile of a segment's rows.
+
+    Error profiles live in parameter space, so they stay comparable across
+    flights even though every flight fits its own model; bottleneck or PCA
+    coordinates would not.
+    """
+
+    profile = np.asarray(feature_scores, dtype=np.float64).reshape(-1, feature_scores.shape[-1])
+    profile = profile.mean(axis=0)
+    norm = np.linalg.norm(profile)
+    if norm > 0:
+        profile = profile / norm
+    return profile.astype(np.float32)
+
+
+def _replace(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _header_vectors(
+    header: Sequence[str], feature_names: Sequence[str], embeddings: np.ndarray
+) -> np.ndarray:
+    """Scatter feature-space embeddings into the recorder header's column order.
+
+    Parameters a flight did not select stay 0, so flights of one recorder
+    type remain comparable however their channel selection differed.
+    """
+
+    column = {name: idx for idx, name in enumerate(header)}
+    missing = [name for name in feature_names if name not in column]
+    if missing:
+        raise ValueError(f"Parameters missing from the recorder header: {', '.join(missing)}")
+    embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, len(feature_names))
+    vectors = np.zeros((embeddings.shape[0], len(header)), dtype=np.float32)
+    vectors[:, [column[name] for name in feature_names]] = embeddings
+    return vectors
+
+
+@dataclass
+class _Partition:
+    vectors: np.ndarray
+    records: List[Dict[str, object]]
+    flight_ids: np.ndarray
+    stamp: Tuple[int, int, int] = (0, 0, 0)
+
+    @property
+    def size(self) -> int:
+        return len(self.records)
+
+
+class SegmentIndex:
+    """Append-only store of segment embeddings, partitioned by recorder header.
+
+    Each header signature gets ``{signature}.f32`` (row-major float32
+    embeddings over the header's columns), ``{signature}.jsonl`` (one record
+    per row: flight and case IDs, run id, segment bounds, the parameters the
+    flight selected) and ``{signature}.dropped.jsonl``. Re-adding a flight
+    appends a tombstone there instead of rewriting the partition; dead rows
+    are compacted away in one rewrite once they outnumber live ones.
+    Queries are exact cosine search over the live rows, which stay in memory
+    until the files change.
+
+    Several processes write the index and any of them may compact it, so
+    every read or write of a partition holds an exclusive ``flock`` on
+    ``{signature}.lock`` for its whole duration.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._partitions: Dict[str, _Partition] = {}
+        self._lock = threading.RLock()
+
+    def _path(self, signature: str, suffix: str) -> Path:
+        return self.directory / f"{signature}{suffix}"
+
+    @contextmanager
+    def _locked(self, signature: str):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._path(signature, ".lock").open("a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def add(
+        self,
+        header: Sequence[str],
+        feature_names: Sequence[str],
+        embeddings: np.ndarray,
+        records: Sequence[Dict[str, object]],
+    ) -> int:
+        """Store one flight's segments, superseding any earlier entries for it."""
+
+        header = [str(name) for name in header]
+        vectors = _header_vectors(header, feature_names, embeddings)
+        signature = header_signature(header)
+        flight_ids = sorted({record.get("flight_id") for record in records} - {None})
+        with self._locked(signature):
+            vector_path = self._path(signature, ".f32")
+            rows = vector_path.stat().st_size // (4 * len(header)) if vector_path.exists() else 0
+            if flight_ids and rows:
+                with self._path(signature, ".dropped.jsonl").open("a") as handle:
+                    for flight_id in flight_ids:
+                        handle.write(json.dumps({"flight_id": flight_id, "rows": rows}) + "\n")
+            # Vectors are appended before records; readers only trust rows
+            # present in both files.
+            with vector_path.open("ab") as handle:
+                handle.write(vectors.tobytes())
+            with self._path(signature, ".jsonl").open("a") as handle:
+                for record in records:
+                    handle.write(json.dumps(dict(record, parameters=list(feature_names))) + "\n")
+            self._partitions.pop(signature, None)
+        return len(records)
+
+    def query(
+        self,
+        header: Sequence[str],
+        feature_names: Sequence[str],
+        embedding: np.ndarray,
+        k: int = DEFAULT_SIMILAR_COUNT,
+        exclude_flight: Optional[str] = None,
+    ) -> List[Dict[str, object]]:
+        header = [str(name) for name in header]
+        partition = self._load(header_signature(header), len(header))
+        if partition.size == 0:
+            return []
+        vector = _header_vectors(header, feature_names, embedding)[0]
+        similarity = partition.vectors @ vector
+        if exclude_flight is not None:
+            similarity[partition.flight_ids == str(exclude_flight)] = -np.inf
+        winners = top_k_indices(similarity, min(k, partition.size))
+        return [
+            dict(partition.records[idx], similarity=round(float(similarity[idx]), 6))
+            for idx in winners
+            if np.isfinite(similarity[idx])
+        ]
+
+    def _stamp(self, signature: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            vectors = self._path(signature, ".f32").stat().st_mtime_ns
+            records = self._path(signature, ".jsonl").stat().st_mtime_ns
+        except OSError:
+            return None
+        dropped_path = self._path(signature, ".dropped.jsonl")
+        dropped = dropped_path.stat().st_mtime_ns if dropped_path.exists() else 0
+        return vectors, records, dropped
+
+    def _load(self, signature: str, dim: int) -> _Partition:
+        if not self._path(signature, ".f32").exists():
+            return _Partition(np.zeros((0, dim), dtype=np.float32), [], np.array([], dtype=object))
+        with self._locked(signature):
+            stamp = self._stamp(signature)
+            if stamp is None:
+                return _Partition(
+                    np.zeros((0, dim), dtype=np.float32), [], np.array([], dtype=object)
+                )
+            cached = self._partitions.get(signature)
+            if cached is not None and cached.stamp == stamp:
+                return cached
+            vectors = np.fromfile(self._path(signature, ".f32"), dtype=np.float32)
+            vectors = vectors[: vectors.size - vectors.size % dim].reshape(-1, dim)
+            with self._path(signature, ".jsonl").open() as handle:
+                records = [json.loads(line) for line in handle if line.strip()]
+            size = min(len(records), vectors.shape[0])
+            vectors = vectors[:size]
+            records = records[:size]
+            flight_ids = np.array([str(record.get("flight_id")) for record in records], dtype=object)
+
+            live = self._live_rows(signature, flight_ids)
+            if live.size < size:
+                vectors = vectors[live]
+                records = [records[idx] for idx in live]
+                flight_ids = flight_ids[live]
+                if size - live.size > live.size:
+                    self._compact(signature, vectors, records)
+                    stamp = self._stamp(signature)
+            partition = _Partition(vectors, records, flight_ids, stamp)
+            self._partitions[signature] = partition
+            return partition
+
+    def _live_rows(self, signature: str, flight_ids: np.ndarray) -> np.ndarray:
+        # A tombstone kills every row of its flight written before it.
+        cutoff: Dict[str, int] = {}
+        dropped_path = self._path(signature, ".dropped.jsonl")
+        if dropped_path.exists():
+            with dropped_path.open() as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = json.loads(line)
+                        flight_id = str(entry["flight_id"])
+                        cutoff[flight_id] = max(cutoff.get(flight_id, 0), int(entry["rows"]))
+        if not cutoff:
+            return np.arange(flight_ids.size)
+        limits = np.array([cutoff.get(flight_id, 0) for flight_id in flight_ids], dtype=np.int64)
+        return np.flatnonzero(np.arange(flight_ids.size) >= limits)
+
+    def _compact(
+        self, signature: str, vectors: np.ndarray, records: List[Dict[str, object]]
+    ) -> None:
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        _replace(self._path(signature, ".f32"), np.ascontiguousarray(vectors).tobytes())
+        _replace(self._path(signature, ".jsonl"), lines.encode())
+        self._path(signature, ".dropped.jsonl").unlink(missing_ok=True)
+
+
+SEGMENT_INDEX: Optional[SegmentIndex] = (
+    SegmentIndex(SIMILARITY_INDEX_DIR) if SIMILARITY_INDEX_DIR else None
+)
+
+
+def index_segments(
+    header: Sequence[str],
+    feature_names: Sequence[str],
+    timestamps: np.ndarray,
+    feature_scores: np.ndarray,
+    segments: Sequence[Dict[str, object]],
+    flight_id: str,
+    case_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    index: Optional[SegmentIndex] = None,
+) -> int:
+    """Add the detected ``segments`` of one flight to the similarity index.
+
+    ``header`` is the flight's full column list; it keys the partition, so
+    flights of one recorder type share it whichever parameters they selected.
+    """
+
+    index = index or SEGMENT_INDEX
+    if index is None or not segments:
+        return 0
+    embeddings = []
+    records = []
+    for segment in segments:
+        mask = (timestamps >= segment["start_time"]) & (timestamps <= segment["end_time"])
+        if not mask.any():
+            continue
+        embeddings.append(segment_embedding(feature_scores[mask]))
+        records.append(
+            {
+                "flight_id": str(flight_id),
+                "case_id": None if case_id is None else str(case_id),
+                "run_id": run_id,
+                "start_time": segment["start_time"],
+                "end_time": segment["end_time"],
+                "severity": segment.get("severity"),
+                "score_peak": segment.get("score_peak"),
+                "top_parameters": [
+                    driver["parameter"] for driver in segment.get("top_drivers", [])[:3]
+                ],
+            }
+        )
+    if not records:
+        return 0
+    return index.add(header, feature_names, np.stack(embeddings), records)
+
+
+def similar_segments(
+    run_id: str,
+    start: float,
+    end: float,
+    k: int = DEFAULT_SIMILAR_COUNT,
+    include_same_flight: bool = False,
+    index: Optional[SegmentIndex] = None,
+    cache: Optional[RunCache] = None,
+) -> List[Dict[str, object]]:
+    """Indexed segments closest to ``[start, end]`` of a cached autoencoder run."""
+
+    index = index or SEGMENT_INDEX
+    cache = cache or RUN_CACHE
+    if index is None:
+        raise ValueError("Similarity search needs FDR_SIMILARITY_INDEX_DIR to be set.")
+    if cache is None:
+        raise ValueError("Similarity search needs FDR_RUN_CACHE_DIR to be set.")
+    arrays, stored = cache.load(run_id)
+    if "timeline_feature_scores" not in arrays:
+        raise ValueError(f"Run {run_id!r} has no per-parameter scores.")
+    timestamps = arrays["timestamps"]
+    mask = (timestamps >= start) & (timestamps <= end)
+    if not mask.any():
+        raise ValueError(f"Run {run_id!r} has no rows between {start} and {end}.")
+    details = stored.get("details", {})
+    if not details.get("header"):
+        raise ValueError(f"Run {run_id!r} predates header-keyed indexing; re-run it.")
+    flight_id = details.get("flight_id")
+    return index.query(
+        details["header"],
+        stored["feature_names"],
+        segment_embedding(arrays["timeline_feature_scores"][mask]),
+        k=k,
+        exclude_flight=None if include_same_flight else flight_id,
+    )
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+RUN_CACHE_DIR = os.getenv("FDR_RUN_CACHE_DIR", "")
+RUN_CACHE_MAX_RUNS = int(os.getenv("FDR_RUN_CACHE_MAX_RUNS", "50"))
+_RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class RunCache:
+    """Intermediate products of an analysis run, keyed by run id.
+
+    Arrays go to ``{run_id}.npz`` and JSON-safe details to
+    ``{run_id}.json``. Other per-run artifacts can live next to them under
+    :meth:`path`. Only the ``max_runs`` most recent runs are kept.
+    """
+
+    def __init__(self, directory: str, max_runs: int = RUN_CACHE_MAX_RUNS) -> None:
+        self.directory = Path(directory)
+        self.max_runs = max(1, max_runs)
+        self._lock = threading.Lock()
+
+    def path(self, run_id: str, suffix: str) -> Path:
+        if not _RUN_ID.match(run_id or ""):
+            raise ValueError(f"Invalid run id {run_id!r}.")
+        return self.directory / f"{run_id}{suffix}"
+
+    def save(self, arrays: Dict[str, np.ndarray], details: Dict[str, object]) -> str:
+        run_id = uuid.uuid4().hex
+        self.directory.mkdir(parents=True, exist_ok=True)
+        npz_path = self.path(run_id, ".npz")
+        tmp_path = npz_path.with_name(f"{run_id}.tmp.npz")
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, npz_path)
+        # The JSON file is written last; a run exists once it is in place.
+        json_path = self.path(run_id, ".json")
+        tmp_path = json_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(details))
+        os.replace(tmp_path, json_path)
+        self._evict()
+        return run_id
+
+    def load(self, run_id: str) -> Tuple[Dict[str, np.ndarray], Dict[str, object]]:
+        try:
+            details = json.loads(self.path(run_id, ".json").read_text())
+            with np.load(self.path(run_id, ".npz")) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+        except (OSError, ValueError) as exc:
+            raise ValueError(f"Run {run_id!r} is not in the run cache.") from exc
+        return arrays, details
+
+    def _evict(self) -> None:
+        with self._lock:
+            runs = sorted(
+                self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True
+            )
+            for stale in runs[self.max_runs :]:
+                for path in self.directory.glob(f"{stale.stem}.*"):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+
+RUN_CACHE: Optional[RunCache] = RunCache(RUN_CACHE_DIR) if RUN_CACHE_DIR else None
@@ -0,0 +1,31 @@
+import numpy as np
+
+from services.fdr_anomaly.autoencoder import _map_window_scores, _score_multires
+from services.fdr_anomaly.shared_buffers import SharedArrayPool
+
+
+def test_anomaly_in_last_partial_stride_is_scored():
+    window_size, stride, n_rows = 20, 5, 1013
+    rng = np.random.default_rng(0)
+    t = np.arange(n_rows)[:, None]
+    values = np.sin(t / np.array([15.0, 40.0, 90.0])) + rng.normal(0, 0.05, (n_rows, 3))
+    # Rows after the last strided coarse window (which ends at row 999).
+    values[1003:, 1] += 8.0
+
+    scored = _score_multires(
+        values,
+        window_size,
+        stride,
+        epochs=1,
+        batch_size=128,
+        threshold_percentile=97.0,
+        buffers=SharedArrayPool("none"),
+        progress=lambda stage, fraction: None,
+    )
+    timeline, _ = _map_window_scores(
+        n_rows, window_size, scored.starts, scored.errors, scored.feature_errors
+    )
+
+    assert n_rows - window_size in scored.starts
+    assert (timeline[1000:] > 0).all()
+    assert timeline[1003:].max() > np.percentile(timeline[:980], 99)
@@ -0,0 +1,61 @@
+from typing import Dict, List
+
+import numpy as np
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest entries along the last axis, largest first.
+
+    Works on a single vector or a 2-D batch (one row per segment). Only the
+    ``k`` winners are sorted: candidates come from ``np.argpartition``. Ties
+    are ordered by ascending index, matching a stable descending sort, and
+    rows where a tie straddles the ``k`` boundary are re-ranked exactly.
+    """
+
+    values = np.asarray(values)
+    n = values.shape[-1]
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.empty(values.shape[:-1] + (0,), dtype=np.intp)
+
+    batch = np.atleast_2d(values)
+    keys = -batch
+    if k < n:
+        candidates = np.argpartition(keys, k - 1, axis=-1)[:, :k]
+        candidate_keys = np.take_along_axis(keys, candidates, axis=-1)
+        boundary = candidate_keys.max(axis=-1, keepdims=True)
+        tied_total = (keys == boundary).sum(axis=-1)
+        tied_selected = (candidate_keys == boundary).sum(axis=-1)
+        straddled = np.where(tied_total > tied_selected)[0]
+        if straddled.size:
+            candidates[straddled] = np.argsort(keys[straddled], axis=-1, kind="stable")[:, :k]
+            candidate_keys = np.take_along_axis(keys, candidates, axis=-1)
+    else:
+        candidates = np.broadcast_to(np.arange(n), batch.shape).copy()
+        candidate_keys = keys
+
+    order = np.lexsort((candidates, candidate_keys), axis=-1)
+    winners = np.take_along_axis(candidates, order, axis=-1)
+    return winners.reshape(values.shape[:-1] + (k,))
+
+
+def rank_top_parameters(segments: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """Count how often each parameter drives a segment, most frequent first.
+
+    Ties keep first-seen order, as the previous stable ``sorted`` did.
+    """
+
+    driver_counts: Dict[str, int] = {}
+    for segment in segments:
+        for driver in segment.get("top_drivers", []):
+            name = driver.get("parameter")
+            if not name:
+                continue
+            driver_counts[name] = driver_counts.get(name, 0) + 1
+
+    names = list(driver_counts)
+    counts = np.fromiter(driver_counts.values(), dtype=np.int64, count=len(names))
+    return [
+        {"parameter": names[idx], "count": int(counts[idx])}
+        for idx in top_k_indices(counts, len(names))
+    ]